@@ -36,7 +36,7 @@ class GameEngine:
 
     def reload(self):
         """Force reload of configuration cache."""
-        self.cache_manager.reload_cache()
+        self.cache_manager.reload()
         logger.info("GameEngine: Cache reloaded.")
 
     # Delegate cache operations to CacheManager
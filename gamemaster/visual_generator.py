@@ -1,6 +1,7 @@
 import os
+import asyncio
 from pathlib import Path
-from typing import Optional, Tuple, Union, List
+from typing import Any, Dict, Optional, Tuple, Union, List
 from google import genai
 from google.genai import types
 from PIL import Image
@@ -14,6 +15,9 @@ logger = get_logger("gamemaster.visual")
 # Constants
 IMAGE_CACHE_DIR = Path("static/images/locations")
 DEFAULT_MODEL = "gemini-2.5-flash-image"
+# Batch generation: concurrent provider requests and per-item timeout (seconds)
+BATCH_MAX_CONCURRENCY = 5
+BATCH_ITEM_TIMEOUT = 180.0
 
 class VisualGenerator:
     def __init__(self):
@@ -163,6 +167,36 @@ class VisualGenerator:
 
         return self._generate_and_save(target_file, prompt, ref_paths or None)
 
+    async def generate_location_visual_async(self, *args, **kwargs) -> Optional[str]:
+        """Async variant of generate_location_visual (runs the blocking call in a worker thread)."""
+        return await asyncio.to_thread(self.generate_location_visual, *args, **kwargs)
+
+    async def generate_scene_visual_async(self, *args, **kwargs) -> Optional[str]:
+        """Async variant of generate_scene_visual (runs the blocking call in a worker thread)."""
+        return await asyncio.to_thread(self.generate_scene_visual, *args, **kwargs)
+
+    async def generate_batch(self, requests: List[Dict[str, Any]], kind: str = "location",
+                             max_concurrency: int = BATCH_MAX_CONCURRENCY,
+                             timeout: float = BATCH_ITEM_TIMEOUT) -> List[Optional[str]]:
+        """
+        Generates several visuals concurrently, at most max_concurrency in flight.
+        Each request holds keyword arguments for generate_location_visual
+        (kind="location") or generate_scene_visual (kind="scene").
+        Returns paths in request order; failed or timed-out items are None.
+        """
+        generate = self.generate_scene_visual_async if kind == "scene" else self.generate_location_visual_async
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(request: Dict[str, Any]) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(generate(**request), timeout)
+                except Exception as e:
+                    logger.error(f"Visual: Batch item failed ({request}): {e!r}")
+                    return None
+
+        return list(await asyncio.gather(*(run_one(r) for r in requests)))
+
     def _generate_and_save(self, target_file: Path, prompt: str, image_ref_paths: Optional[List[str]] = None) -> Optional[str]:
         """Internal helper to handle API call and saving."""
         # 1. Check Cache
@@ -0,0 +1,50 @@
+"""
+JSON codec shim used for player state and plan files.
+
+Uses orjson when it is installed and falls back to the stdlib json module
+otherwise, so callers get the same API either way. Objects the codec cannot
+serialize natively (e.g. Path) are written as str(), like json's default=str.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+
+def _default(obj: Any) -> str:
+    return str(obj)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes; indent=True gives 2-space indentation."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(obj, default=_default, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file in one shot."""
+    return loads(Path(path).read_bytes())
+
+
+def dump_file(obj: Any, path: Union[str, Path], indent: bool = True) -> None:
+    """Serialize obj and write it to path (2-space indented by default)."""
+    Path(path).write_bytes(dumps(obj, indent=indent))
@@ -1,9 +1,9 @@
-import json
 import requests
 import streamlit as st
 from pathlib import Path
 from npc_engine.main_fast import load_player_from_json_data, load_world
 from npc_engine.engine.master.hooks.registry import execute_hook
+from npc_engine.engine import json_compat
 import npc_engine.engine.master.hooks.quest_hooks # Ensure hooks are registered
 
 # --- CONSTANTS ---
@@ -147,8 +147,7 @@ def save_player_state(data):
         to prevent progress loss.
     """
     try:
-        with open(PLAYER_STATE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        json_compat.dump_file(data, PLAYER_STATE_FILE)
     except Exception as e:
         st.error(f"Failed to save state: {e}")
 
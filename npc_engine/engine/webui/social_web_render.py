@@ -1,12 +1,41 @@
 import streamlit as st
+import os
 import json
+import hashlib
+from collections import defaultdict
 from pathlib import Path
+from typing import List
 from PIL import Image
 from npc_engine.engine.master.pddl_orchestrator import PDDLOrchestrator
+from npc_engine.engine import json_compat
 from gamemaster import social_llm
 from .social_web_handle import handle_npc_interaction, handle_navigation, handle_item_pickup, handle_leave_conversation, handle_quest_acceptance
 from .social_web_libs import sync_world, save_player_state, PLAYER_STATE_FILE
 
+# Dev-only: render the "Available Moves" debug expander in SOCIAL mode
+DEBUG_MOVES = os.environ.get("DAQS_DEBUG_MOVES") == "1"
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _valid_moves(state_sig: str, _state_json: str) -> List[str]:
+    """Cached engine.get_valid_moves; keyed by state_sig only, the snapshot is rehydrated on miss."""
+    return st.session_state.engine.get_valid_moves(json.loads(_state_json))
+
+def get_valid_moves_cached() -> List[str]:
+    """
+    Return valid moves for the current social state, shared across renders.
+
+    The social state plus player data is snapshotted as sorted JSON; its hash
+    (together with the engine instance) keys the cache, so repeated reruns and
+    the several call sites within one rerun hit the engine only once per
+    distinct state.
+    """
+    state = st.session_state.social_state.copy()
+    state["player_data"] = st.session_state.player_data
+    state_json = json.dumps(state, sort_keys=True, default=str)
+    engine_id = id(st.session_state.engine)
+    state_sig = hashlib.sha1(f"{engine_id}:{state_json}".encode("utf-8")).hexdigest()
+    return _valid_moves(state_sig, state_json)
+
 def render_sidebar():
     """
     Render the application sidebar with system controls and player status.
@@ -66,8 +95,7 @@ def render_sidebar():
             st.session_state.world_messages = []
             st.session_state.social_messages = []
             if PLAYER_STATE_FILE.exists():
-                with open(PLAYER_STATE_FILE, 'r') as f:
-                    st.session_state.player_data = json.load(f)
+                st.session_state.player_data = json_compat.load_file(PLAYER_STATE_FILE)
             save_player_state(st.session_state.player_data)
             st.rerun()
 
@@ -331,9 +359,7 @@ def render_right_column():
                         st.rerun()
 
             st.write("#### Available Moves")
-            state = st.session_state.social_state.copy()
-            state["player_data"] = st.session_state.player_data
-            moves = engine.get_valid_moves(state)
+            moves = get_valid_moves_cached()
             for m in moves:
                 st.code(m, language="bash")
 
@@ -395,15 +421,22 @@ def render_chat():
                 try:
                     img_val = msg["image"]
                     img_path = Path(img_val) if isinstance(img_val, str) else img_val
-                    if isinstance(img_path, Path) and not img_path.exists():
+                    if msg.get("_img_ok"):
+                        # Verified on an earlier rerun; skip the disk read + PIL header parse
+                        st.image(img_path, width="stretch")
+                    elif msg.get("_img_err"):
+                        st.warning(f"Image failed to render (corrupt?): {msg['_img_err']}")
+                    elif isinstance(img_path, Path) and not img_path.exists():
                         st.warning(f"Missing image: {img_path}")
                     elif img_path:
                         try:
                             # Validate image can be opened to avoid PIL UnidentifiedImageError
                             with open(img_path, "rb") as f:
                                 Image.open(f).verify()  # type: ignore[attr-defined]
+                            msg["_img_ok"] = True
                             st.image(img_path, width="stretch")
                         except Exception as e:
+                            msg["_img_err"] = str(e)
                             st.warning(f"Image failed to render (corrupt?): {e}")
                 except Exception as e:
                     st.warning(f"Image failed to render: {e}")
@@ -430,11 +463,14 @@ def render_chat():
         last_msg_role = st.session_state.social_messages[-1]["role"] if st.session_state.social_messages else "assistant"
 
         if last_msg_role == "user":
-            state = st.session_state.social_state.copy()
-            state["player_data"] = st.session_state.player_data
-            available_moves = st.session_state.engine.get_valid_moves(state)
-            npc_offer_moves = [move for move in available_moves if move.startswith("npc-offer")]
-            npc_flirt_moves = [move for move in available_moves if move.startswith("npc-flirt")]
+            available_moves = get_valid_moves_cached()
+            # Single pass: bucket NPC-initiated moves by action prefix
+            npc_moves = defaultdict(list)
+            for move in available_moves:
+                if move.startswith(("npc-offer", "npc-flirt")):
+                    npc_moves[move[:9]].append(move)
+            npc_offer_moves = npc_moves["npc-offer"]
+            npc_flirt_moves = npc_moves["npc-flirt"]
 
             # Prioritize flirting over offers
             if npc_flirt_moves:
@@ -456,13 +492,12 @@ def render_chat():
                     st.session_state.social_messages.append({"role": "assistant", "content": payload})
                     st.rerun()
 
-        # DEBUG: Show available moves (Always visible in debug expander)
-        with st.expander("🐛 Debug: Available Moves"):
-            st.write(f"Current context: {st.session_state.social_state.get('current_context')}")
-            st.write(f"Active persona: {st.session_state.social_state.get('active_persona')}")
-            # Re-calculate moves for debug display if not in user turn
-            state_dbg = st.session_state.social_state.copy()
-            state_dbg["player_data"] = st.session_state.player_data
-            moves_dbg = st.session_state.engine.get_valid_moves(state_dbg)
-            st.write(f"All moves: {moves_dbg}")
-            st.write(f"Last message role: {last_msg_role}")
+        # DEBUG: Show available moves (opt-in via DAQS_DEBUG_MOVES=1; expanders run their body even when collapsed)
+        if DEBUG_MOVES:
+            with st.expander("🐛 Debug: Available Moves"):
+                st.write(f"Current context: {st.session_state.social_state.get('current_context')}")
+                st.write(f"Active persona: {st.session_state.social_state.get('active_persona')}")
+                # Re-calculate moves for debug display if not in user turn
+                moves_dbg = get_valid_moves_cached()
+                st.write(f"All moves: {moves_dbg}")
+                st.write(f"Last message role: {last_msg_role}")
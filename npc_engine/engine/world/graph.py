@@ -1,8 +1,10 @@
 """Модели графа мира."""
 
 from __future__ import annotations
+import logging
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Any, Union
+from typing import Callable, Dict, List, Optional, Set, Tuple, Any, Union
 from enum import Enum, auto
 from collections import defaultdict
 from pydantic import BaseModel, Field
@@ -23,6 +25,17 @@ class NodeType(str, Enum):
     NPC = "npc"
 
 
+# NodeType -> PDDL тип (SUB_LOCATION сводится к location)
+_PDDL_TYPE_MAP: Dict[NodeType, str] = {
+    NodeType.REGION: "region",
+    NodeType.LOCATION: "location",
+    NodeType.SUB_LOCATION: "location",
+    NodeType.OBJECT: "object",
+    NodeType.ITEM: "item",
+    NodeType.NPC: "npc",
+}
+
+
 class EdgeType(str, Enum):
     """Типы связей."""
     PATH = "path"
@@ -64,13 +77,34 @@ class ConditionType(str, Enum):
     AND = "AND"
 
 
-@dataclass
+# Значение -> член перечисления (без Enum.__call__ на каждый парсинг)
+_COND_TYPE: Dict[str, ConditionType] = {c.value: c for c in ConditionType}
+_NODE_TYPE: Dict[str, NodeType] = {n.value: n for n in NodeType}
+
+
+def condition_type_from_value(value: str) -> ConditionType:
+    """Быстрый аналог ConditionType(value); сохраняет ValueError для неизвестных значений."""
+    try:
+        return _COND_TYPE[value]
+    except KeyError:
+        raise ValueError(f"{value!r} is not a valid {ConditionType.__name__}") from None
+
+
+def node_type_from_value(value: str) -> NodeType:
+    """Быстрый аналог NodeType(value); сохраняет ValueError для неизвестных значений."""
+    try:
+        return _NODE_TYPE[value]
+    except KeyError:
+        raise ValueError(f"{value!r} is not a valid {NodeType.__name__}") from None
+
+
+@dataclass(frozen=True)
 class Condition:
-    """Условие для перехода/действия."""
+    """Условие для перехода/действия (неизменяемое: экземпляры общие между рёбрами)."""
     type: ConditionType
     target: str
     value: Any = None
-    sub_conditions: List['Condition'] = field(default_factory=list)
+    sub_conditions: Tuple['Condition', ...] = ()
     
     def to_pddl_precondition(self) -> str:
         """Конвертирует в PDDL предусловие."""
@@ -99,41 +133,75 @@ class Condition:
     
     @classmethod
     def from_yaml(cls, data: Union[str, dict]) -> 'Condition':
-        """Парсит условие из YAML."""
+        """Парсит условие из YAML.
+        
+        Одинаковые условия возвращаются как один общий неизменяемый объект.
+        """
+        return _intern_condition(cls._parse_yaml(data))
+    
+    @classmethod
+    def _parse_yaml(cls, data: Union[str, dict]) -> 'Condition':
         if isinstance(data, str):
             # Формат "has_item: torch" или "has_ability: stealth"
-            if ":" in data:
-                parts = data.split(":", 1)
+            head, sep, tail = data.partition(":")
+            if sep:
                 return cls(
-                    type=ConditionType(parts[0].strip()),
-                    target=parts[1].strip()
+                    type=condition_type_from_value(head.strip()),
+                    target=tail.strip()
                 )
             return cls(type=ConditionType.STATE, target=data)
         
-        if isinstance(data, dict):
-            if "OR" in data:
-                return cls(
-                    type=ConditionType.OR,
-                    target="",
-                    sub_conditions=[cls.from_yaml(c) for c in data["OR"]]
-                )
-            if "AND" in data:
-                return cls(
-                    type=ConditionType.AND,
-                    target="",
-                    sub_conditions=[cls.from_yaml(c) for c in data["AND"]]
-                )
-            
-            # Одиночное условие как dict
-            for key, value in data.items():
-                return cls(
-                    type=ConditionType(key),
-                    target=str(value)
-                )
+        if isinstance(data, dict) and data:
+            # {"OR": [...]}, {"AND": [...]} или одиночное условие {has_item: torch}
+            key = next(iter(data))
+            parser = _COND_DISPATCH.get(key)
+            if parser is None:
+                raise ValueError(f"{key!r} is not a valid {ConditionType.__name__}")
+            return parser(data[key])
         
         raise ValueError(f"Invalid condition format: {data}")
 
 
+# Hash-consing условий: (type, target, value, id подусловий) -> общий экземпляр.
+# Подусловия сами интернированы и живут в кэше, поэтому их id стабильны.
+_condition_cache: Dict[tuple, Condition] = {}
+
+
+def _intern_condition(cond: Condition) -> Condition:
+    key = (cond.type, cond.target, cond.value, tuple(map(id, cond.sub_conditions)))
+    return _condition_cache.setdefault(key, cond)
+
+
+def _parse_or(value: Any) -> Condition:
+    return Condition(
+        type=ConditionType.OR,
+        target="",
+        sub_conditions=tuple(Condition.from_yaml(c) for c in value)
+    )
+
+
+def _parse_and(value: Any) -> Condition:
+    return Condition(
+        type=ConditionType.AND,
+        target="",
+        sub_conditions=tuple(Condition.from_yaml(c) for c in value)
+    )
+
+
+def _simple_parser(cond_type: ConditionType) -> Callable[[Any], Condition]:
+    def parse(value: Any) -> Condition:
+        return Condition(type=cond_type, target=str(value))
+    return parse
+
+
+# Ключ dict-формы условия -> парсер значения
+_COND_DISPATCH: Dict[str, Callable[[Any], Condition]] = {
+    ct.value: _simple_parser(ct) for ct in ConditionType
+}
+_COND_DISPATCH[ConditionType.OR.value] = _parse_or
+_COND_DISPATCH[ConditionType.AND.value] = _parse_and
+
+
 # ============================================================
 # ВЗАИМОДЕЙСТВИЯ
 # ============================================================
@@ -176,17 +244,19 @@ class WorldNode:
     # Взаимодействия (для объектов)
     interactions: List[Interaction] = field(default_factory=list)
     
+    def __post_init__(self):
+        # Интернируем ID: ключи словарей и связи ссылаются на один объект строки
+        if isinstance(self.id, str):
+            self.id = sys.intern(self.id)
+    
     def get_pddl_type(self) -> str:
         """Возвращает PDDL тип."""
-        type_map = {
-            NodeType.REGION: "region",
-            NodeType.LOCATION: "location",
-            NodeType.SUB_LOCATION: "location",
-            NodeType.OBJECT: "object",
-            NodeType.ITEM: "item",
-            NodeType.NPC: "npc",
-        }
-        return type_map.get(self.type, "object")
+        return _PDDL_TYPE_MAP.get(self.type, "object")
+
+
+def _intern_ids(ids: List[str]) -> List[str]:
+    """Интернирует строковые ID списка (нестроковые значения оставляет как есть)."""
+    return [sys.intern(i) if isinstance(i, str) else i for i in ids]
 
 
 @dataclass
@@ -207,6 +277,15 @@ class LocationNode(WorldNode):
     has_fast_travel: bool = False
     danger_level: str = "low"
 
+    def __post_init__(self):
+        super().__post_init__()
+        # Регион и содержимое — те же ID, что и ключи all_nodes
+        if isinstance(self.region, str):
+            self.region = sys.intern(self.region)
+        self.contained_items = _intern_ids(self.contained_items)
+        self.contained_objects = _intern_ids(self.contained_objects)
+        self.contained_npcs = _intern_ids(self.contained_npcs)
+
 
 @dataclass
 class ItemNode(WorldNode):
@@ -245,6 +324,13 @@ class Edge:
     conditions: List[Condition] = field(default_factory=list)
     properties: Dict[str, Any] = field(default_factory=dict) # <-- RESTORED
     
+    def __post_init__(self):
+        # Сравнение from_node/to_node с интернированными ID сводится к проверке identity
+        if isinstance(self.from_node, str):
+            self.from_node = sys.intern(self.from_node)
+        if isinstance(self.to_node, str):
+            self.to_node = sys.intern(self.to_node)
+    
     def to_pddl_action_precondition(self) -> str:
         """Генерирует предусловие для PDDL действия."""
         preconditions = [f"(at player {self.from_node})"]
@@ -292,16 +378,62 @@ class WorldGraph:
     # Способности мира
     abilities: Dict[str, Any] = field(default_factory=dict)
     
+    # Ключи (from, to, type) уже добавленных связей — дедупликация при загрузке
+    _edge_keys: Set[tuple] = field(default_factory=set, repr=False, compare=False)
+    # Индексы связей по from_node / to_node (ведёт add_edge)
+    _out_edges: Dict[str, List[Edge]] = field(default_factory=dict, repr=False, compare=False)
+    _in_edges: Dict[str, List[Edge]] = field(default_factory=dict, repr=False, compare=False)
+    
+    # Персональные состояния игрока (заполняет WorldRegenerator); узлы разделяются
+    # с базовым миром и не изменяются
+    player_node_states: Dict[str, NodeState] = field(default_factory=dict)
+    player_object_states: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    
     def get_node(self, node_id: str) -> Optional[WorldNode]:
         """Получает узел по ID."""
         return self.all_nodes.get(node_id)
     
+    def get_node_state(self, node_id: str) -> Optional[NodeState]:
+        """Состояние узла с учётом персональных изменений игрока."""
+        state = self.player_node_states.get(node_id)
+        if state is not None:
+            return state
+        node = self.all_nodes.get(node_id)
+        return node.state if node else None
+    
+    def get_custom_states(self, node_id: str) -> Dict[str, str]:
+        """Кастомные состояния объекта с учётом персональных изменений игрока."""
+        states = self.player_object_states.get(node_id)
+        if states is not None:
+            return states
+        node = self.all_nodes.get(node_id)
+        return node.custom_states if node else {}
+    
+    def add_edge(self, edge: Edge) -> bool:
+        """Добавляет связь, если связи с тем же (from, to, type) ещё нет."""
+        key = (edge.from_node, edge.to_node, edge.edge_type)
+        if key in self._edge_keys:
+            return False
+        self._edge_keys.add(key)
+        self.edges.append(edge)
+        self._out_edges.setdefault(edge.from_node, []).append(edge)
+        self._in_edges.setdefault(edge.to_node, []).append(edge)
+        return True
+    
+    def _edge_index_valid(self) -> bool:
+        # edges могли дополнить напрямую, в обход add_edge — тогда индексы неполные
+        return len(self._edge_keys) == len(self.edges)
+    
     def get_connections_from(self, node_id: str) -> List[Edge]:
         """Получает все исходящие связи."""
+        if self._edge_index_valid():
+            return list(self._out_edges.get(node_id, ()))
         return [e for e in self.edges if e.from_node == node_id]
     
     def get_connections_to(self, node_id: str) -> List[Edge]:
         """Получает все входящие связи."""
+        if self._edge_index_valid():
+            return list(self._in_edges.get(node_id, ()))
         return [e for e in self.edges if e.to_node == node_id]
     
     def get_accessible_locations(
@@ -343,15 +475,14 @@ class WorldGraph:
         }
         
         for node_id, node in self.all_nodes.items():
-            pddl_type = node.get_pddl_type()
-            if pddl_type in types:
-                types[pddl_type].append(node_id)
+            types[_PDDL_TYPE_MAP[node.type]].append(node_id)
         
         # Log type counts
-        total_objects = sum(len(obj_list) for obj_list in types.values())
-        logger.debug(f"PDDL types collected: {total_objects} total objects")
-        for type_name, obj_list in types.items():
-            if obj_list:
-                logger.debug(f"  {type_name}: {len(obj_list)} objects - {obj_list[:3]}{'...' if len(obj_list) > 3 else ''}")
+        if logger.isEnabledFor(logging.DEBUG):
+            total_objects = sum(len(obj_list) for obj_list in types.values())
+            logger.debug(f"PDDL types collected: {total_objects} total objects")
+            for type_name, obj_list in types.items():
+                if obj_list:
+                    logger.debug(f"  {type_name}: {len(obj_list)} objects - {obj_list[:3]}{'...' if len(obj_list) > 3 else ''}")
         
         return types
\ No newline at end of file
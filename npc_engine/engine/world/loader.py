@@ -1,68 +1,97 @@
+import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, cast
-from .graph import WorldGraph, WorldNode, NodeType, LocationNode, ItemNode, NPCNode, Edge, EdgeType, Condition
+from .graph import WorldGraph, WorldNode, NodeType, LocationNode, ItemNode, NPCNode, Edge, EdgeType, Condition, node_type_from_value
+
+# libyaml-backed parser when PyYAML was built with it, pure-Python SafeLoader otherwise
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 def load_yaml_file(path: Path) -> dict:
-    """Load YAML file."""
-    with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    """Load YAML file.
+
+    The file is read into memory with a single read and parsed from the
+    buffer (UTF-8), so the I/O of many small node files overlaps cleanly when
+    called from the loader's thread pool.
+    """
+    return yaml.load(path.read_bytes(), Loader=YamlLoader) or {}
+
+def resolve_containments(world: WorldGraph):
+    """Resolve containment references not already linked while processing 'contains'.
 
-def resolve_containments(world: WorldGraph, all_raw_nodes: Dict[str, WorldNode]):
-    """Resolve containment references."""
-    for loc_id, loc in world.locations.items():
+    Also makes sure every contained item id is registered in world.items
+    (needed for quest generation).
+    """
+    for loc in world.locations.values():
         for item_id in loc.contained_items:
-            if item_id in world.items:
-                loc.items[item_id] = world.items[item_id]
+            if item_id in loc.items:
+                continue
+            item = world.items.get(item_id)
+            if item is not None:
+                loc.items[item_id] = item
+            elif item_id in world.all_nodes:
+                world.items[item_id] = cast(ItemNode, world.all_nodes[item_id])
         for obj_id in loc.contained_objects:
-            if obj_id in world.objects:
+            if obj_id not in loc.objects and obj_id in world.objects:
                 loc.objects[obj_id] = world.objects[obj_id]
         for npc_id in loc.contained_npcs:
-            if npc_id in world.npcs:
+            if npc_id not in loc.npcs and npc_id in world.npcs:
                 loc.npcs[npc_id] = world.npcs[npc_id]
 
+def _make_location(base_kwargs: dict, get) -> LocationNode:
+    return LocationNode(
+        **base_kwargs,
+        region=get("region"),
+        contained_items=get("contained_items", []),
+        contained_objects=get("contained_objects", []),
+        contained_npcs=get("contained_npcs", []),
+    )
+
+def _make_item(base_kwargs: dict, get) -> ItemNode:
+    return ItemNode(**base_kwargs)
+
+def _make_npc(base_kwargs: dict, get) -> NPCNode:
+    node = NPCNode(
+        **base_kwargs,
+        personality=get("personality"),
+        speech_style=get("speech_style")
+    )
+    node.properties["dialogue_quest"] = get("dialogue_quest", False)
+    node.properties["social_persona"] = get("social_persona", "persona_cyber")
+    return node
+
+# Node type -> constructor; other types become a plain WorldNode
+_NODE_CTORS = {
+    NodeType.LOCATION: _make_location,
+    NodeType.ITEM: _make_item,
+    NodeType.NPC: _make_npc,
+}
+
 def create_node_from_data(data: dict) -> WorldNode:
     """Factory to create a specific node type from data dictionary."""
+    get = data.get
     node_id = data["id"]
-    node_type_str = data.get("type", "object").lower()
-    node_type = NodeType(node_type_str)
+    node_type = node_type_from_value(get("type", "object").lower())
     
     base_kwargs = {
         "id": node_id,
         "type": node_type,
-        "name": data.get("name", node_id),
-        "description": data.get("description", ""),
-        "properties": data.get("properties", {}),
+        "name": get("name", node_id),
+        "description": get("description", ""),
+        "properties": get("properties", {}),
     }
     
-    if node_type == NodeType.LOCATION:
-        return LocationNode(
-            **base_kwargs,
-            region=data.get("region"),
-            contained_items=data.get("contained_items", []),
-            contained_objects=data.get("contained_objects", []),
-            contained_npcs=data.get("contained_npcs", []),
-        )
-    elif node_type == NodeType.ITEM:
-        return ItemNode(**base_kwargs)
-    elif node_type == NodeType.NPC:
-        node = NPCNode(
-            **base_kwargs,
-            personality=data.get("personality"),
-            speech_style=data.get("speech_style")
-        )
-        node.properties["dialogue_quest"] = data.get("dialogue_quest", False)
-        node.properties["social_persona"] = data.get("social_persona", "persona_cyber")
-        return node
-    else:
+    ctor = _NODE_CTORS.get(node_type)
+    if ctor is None:
         return WorldNode(**base_kwargs)
+    return ctor(base_kwargs, get)
 
-def register_node(world: WorldGraph, node: WorldNode, all_raw_nodes: Dict[str, WorldNode]):
+def register_node(world: WorldGraph, node: WorldNode):
     """Registers a node into the world graph structures."""
-    if node.id in all_raw_nodes:
-        return 
-    all_raw_nodes[node.id] = node
-    world.all_nodes[node.id] = node
+    # First registration wins; membership test and insert in one lookup
+    if world.all_nodes.setdefault(node.id, node) is not node:
+        return
     if node.type == NodeType.REGION:
         world.regions[node.id] = node
     elif node.type == NodeType.LOCATION:
@@ -77,7 +106,34 @@ def register_node(world: WorldGraph, node: WorldNode, all_raw_nodes: Dict[str, W
     elif node.type == NodeType.OBJECT:
         world.objects[node.id] = cast(WorldNode, node)
 
-def _process_contains(world: WorldGraph, parent_node: WorldNode, data: dict, all_raw_nodes: Dict[str, WorldNode], raw_data: Dict[str, dict]):
+def _add_link(
+    world: WorldGraph,
+    from_node: str,
+    to_node: str,
+    edge_type: EdgeType,
+    bidirectional: bool = False,
+    conditions: Optional[List[Condition]] = None,
+    properties: Optional[dict] = None,
+):
+    """Adds a link; bidirectional links also get the reverse edge.
+
+    Both directions share the same conditions list and properties dict
+    (edge properties are treated as read-only after load).
+    """
+    conditions = conditions if conditions is not None else []
+    properties = properties if properties is not None else {}
+    world.add_edge(Edge(
+        from_node=from_node, to_node=to_node, edge_type=edge_type,
+        bidirectional=bidirectional, conditions=conditions, properties=properties
+    ))
+    if bidirectional:
+        world.add_edge(Edge(
+            from_node=to_node, to_node=from_node, edge_type=edge_type,
+            bidirectional=True, conditions=conditions,
+            properties=properties
+        ))
+
+def _process_contains(world: WorldGraph, parent_node: WorldNode, data: dict, raw_data: Dict[str, dict]):
     """Recursively processes the 'contains' section of a node."""
     contains = data.get("contains", {})
     if not contains: return
@@ -91,32 +147,44 @@ def _process_contains(world: WorldGraph, parent_node: WorldNode, data: dict, all
             if "id" not in child_data: continue
             child_data["type"] = child_type
             child_node = create_node_from_data(child_data)
-            register_node(world, child_node, all_raw_nodes) # Ensure child is registered globally
+            register_node(world, child_node) # Ensure child is registered globally
             raw_data[child_node.id] = child_data
+            # Link the registered node (first registration wins on duplicate ids)
+            registered = world.all_nodes[child_node.id]
             
             if isinstance(parent_node, LocationNode):
-                if child_type == "npc": parent_node.contained_npcs.append(child_node.id)
-                elif child_type == "item": parent_node.contained_items.append(child_node.id)
+                if child_type == "npc":
+                    parent_node.contained_npcs.append(child_node.id)
+                    if registered.type == NodeType.NPC: parent_node.npcs[registered.id] = cast(NPCNode, registered)
+                elif child_type == "item":
+                    parent_node.contained_items.append(child_node.id)
+                    if registered.type == NodeType.ITEM: parent_node.items[registered.id] = cast(ItemNode, registered)
                 elif child_type == "object": 
                     parent_node.contained_objects.append(child_node.id)
+                    if registered.type == NodeType.OBJECT: parent_node.objects[registered.id] = registered
                     
                     # --- AUTO-EDGE FOR PORTALS ---
                     props = child_data.get("properties", {})
                     if props.get("is_portal"):
                         target = props.get("target_location")
                         if target:
-                            # Create a virtual edge for navigation/oracle
-                            edge = Edge(
-                                from_node=parent_node.id,
-                                to_node=target,
-                                edge_type=EdgeType.PORTAL,
-                                bidirectional=props.get("bidirectional", False),
-                                properties=props
-                            )
-                            world.edges.append(edge)
-                            # Handle bidirectional portals
-                            if edge.bidirectional:
-                                world.edges.append(Edge(from_node=target, to_node=parent_node.id, edge_type=EdgeType.PORTAL, bidirectional=True, properties=props))
+                            # Create a virtual edge (both ways for bidirectional portals) for navigation/oracle
+                            _add_link(world, parent_node.id, target, EdgeType.PORTAL,
+                                      bidirectional=props.get("bidirectional", False), properties=props)
+
+def _list_yaml_files(root: Path) -> List[Path]:
+    """Lists *.yaml files under root in a deterministic order.
+
+    Walks with os.walk and sorts plain name strings per directory instead of
+    sorting the full rglob result by Path; first-wins registration depends on
+    the order being stable, not on it being global path order.
+    """
+    paths: List[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        base = Path(dirpath)
+        paths.extend(base / name for name in sorted(filenames) if name.endswith(".yaml"))
+    return paths
 
 def load_world_from_flat_yaml(world_dir: Path) -> WorldGraph:
     """Load WorldGraph from flat or hierarchical regional YAML architecture."""
@@ -132,15 +200,19 @@ def load_world_from_flat_yaml(world_dir: Path) -> WorldGraph:
     )
     
     nodes_dir = world_dir / "nodes"
-    all_raw_nodes: Dict[str, WorldNode] = {}
     raw_data: Dict[str, dict] = {}
     
-    for yaml_path in sorted(nodes_dir.rglob("*.yaml")):
-        data = load_yaml_file(yaml_path)
+    # Parse files concurrently; registration below stays sequential so insertion
+    # order into all_nodes / edges / region_to_locations remains deterministic.
+    yaml_paths = _list_yaml_files(nodes_dir)
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        parsed = list(pool.map(load_yaml_file, yaml_paths))
+    
+    for data in parsed:
         if not data or "id" not in data: continue
             
         main_node = create_node_from_data(data)
-        register_node(world, main_node, all_raw_nodes)
+        register_node(world, main_node)
         raw_data[main_node.id] = data
         
         # 1. Handle Regional Atlas (Locations inside Region)
@@ -151,14 +223,14 @@ def load_world_from_flat_yaml(world_dir: Path) -> WorldGraph:
                 if "region" not in loc_data: loc_data["region"] = main_node.id
                 
                 loc_node = create_node_from_data(loc_data)
-                register_node(world, loc_node, all_raw_nodes)
+                register_node(world, loc_node)
                 raw_data[loc_node.id] = loc_data
-                _process_contains(world, loc_node, loc_data, all_raw_nodes, raw_data)
+                _process_contains(world, loc_node, loc_data, raw_data)
 
         # 2. Handle Location Atlas (NPCs/Items inside Location)
-        _process_contains(world, main_node, data, all_raw_nodes, raw_data)
+        _process_contains(world, main_node, data, raw_data)
 
-    resolve_containments(world, all_raw_nodes)
+    resolve_containments(world)
     
     # 3. Add Edges (Must check ALL nodes registered in raw_data)
     for node_id, data in raw_data.items():
@@ -168,23 +240,12 @@ def load_world_from_flat_yaml(world_dir: Path) -> WorldGraph:
             to_id = conn.get("to")
             if not to_id or to_id not in world.all_nodes: continue
             
-            edge = Edge(
-                from_node=node_id,
-                to_node=to_id,
-                edge_type=EdgeType(conn.get("edge_type", "path")),
+            _add_link(
+                world, node_id, to_id,
+                EdgeType(conn.get("edge_type", "path")),
                 bidirectional=conn.get("bidirectional", False),
                 conditions=[Condition.from_yaml(c) for c in conn.get("conditions", [])],
                 properties=conn
             )
-            world.edges.append(edge)
-            if edge.bidirectional:
-                reverse_props = conn.copy()
-                world.edges.append(Edge(from_node=to_id, to_node=node_id, edge_type=edge.edge_type, bidirectional=True, conditions=edge.conditions, properties=reverse_props))
-    
-    # Final pass: Ensure all contained items are registered in world.items for quest generation
-    for loc_node in world.locations.values():
-        for item_id in loc_node.contained_items:
-            if item_id in world.all_nodes and item_id not in world.items:
-                world.items[item_id] = cast(ItemNode, world.all_nodes[item_id])
     
     return world
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, List, Set, Optional, Any
+from typing import Callable, Dict, List, Set, Optional, Any, Tuple
 from datetime import datetime
+from functools import lru_cache
+import heapq
 import json
 import time  # used for respawn scheduling
 
@@ -26,6 +28,11 @@ class PlayerInventory:
     """Инвентарь игрока."""
     items: Dict[str, int] = field(default_factory=dict)  # item_id -> количество
     capacity: int = 20
+    # Сумма количеств в items; поддерживается add_item/remove_item
+    current_size: int = field(default=0, init=False)
+    
+    def __post_init__(self):
+        self.current_size = sum(self.items.values())
     
     def has_item(self, item_id: str, count: int = 1) -> bool:
         return self.items.get(item_id, 0) >= count
@@ -34,6 +41,7 @@ class PlayerInventory:
         if self.current_size + count > self.capacity:
             return False
         self.items[item_id] = self.items.get(item_id, 0) + count
+        self.current_size += count
         return True
     
     def remove_item(self, item_id: str, count: int = 1) -> bool:
@@ -42,11 +50,8 @@ class PlayerInventory:
         self.items[item_id] -= count
         if self.items[item_id] <= 0:
             del self.items[item_id]
+        self.current_size = max(0, self.current_size - count)
         return True
-    
-    @property
-    def current_size(self) -> int:
-        return sum(self.items.values())
 
 
 @dataclass
@@ -63,6 +68,18 @@ class QuestProgress:
 # DIFF СОСТОЯНИЯ (для регенерации)
 # ============================================================
 
+def _edge_keys_from_list(raw: List[Any]) -> Set[Tuple[str, str]]:
+    """Читает ключи связей: [from, to] или устаревший формат "from:to"."""
+    keys = set()
+    for entry in raw:
+        if isinstance(entry, str):
+            from_node, _, to_node = entry.partition(":")
+            keys.add((from_node, to_node))
+        else:
+            keys.add((entry[0], entry[1]))
+    return keys
+
+
 @dataclass
 class GraphDiff:
     """Изменения графа относительно базового."""
@@ -74,10 +91,10 @@ class GraphDiff:
     object_states: Dict[str, Dict[str, str]] = field(default_factory=dict)
     
     # Разблокированные связи
-    unlocked_edges: Set[str] = field(default_factory=set)  # "from:to"
+    unlocked_edges: Set[Tuple[str, str]] = field(default_factory=set)  # (from, to)
     
     # Заблокированные связи (например, обвал)
-    blocked_edges: Set[str] = field(default_factory=set)
+    blocked_edges: Set[Tuple[str, str]] = field(default_factory=set)
     
     # Удалённые узлы (собранные предметы, побеждённые враги)
     removed_nodes: Set[str] = field(default_factory=set)
@@ -90,8 +107,8 @@ class GraphDiff:
         return {
             "node_states": {k: v.value for k, v in self.node_states.items()},
             "object_states": self.object_states,
-            "unlocked_edges": list(self.unlocked_edges),
-            "blocked_edges": list(self.blocked_edges),
+            "unlocked_edges": [list(e) for e in self.unlocked_edges],
+            "blocked_edges": [list(e) for e in self.blocked_edges],
             "removed_nodes": list(self.removed_nodes),
             "added_nodes": self.added_nodes,
         }
@@ -102,8 +119,8 @@ class GraphDiff:
         return cls(
             node_states={k: NodeState(v) for k, v in data.get("node_states", {}).items()},
             object_states=data.get("object_states", {}),
-            unlocked_edges=set(data.get("unlocked_edges", [])),
-            blocked_edges=set(data.get("blocked_edges", [])),
+            unlocked_edges=_edge_keys_from_list(data.get("unlocked_edges", [])),
+            blocked_edges=_edge_keys_from_list(data.get("blocked_edges", [])),
             removed_nodes=set(data.get("removed_nodes", [])),
             added_nodes=data.get("added_nodes", {}),
         )
@@ -113,6 +130,39 @@ class GraphDiff:
 # СОСТОЯНИЕ ИГРОКА
 # ============================================================
 
+@lru_cache(maxsize=1024)
+def _split_state_target(target: str) -> Tuple[str, str]:
+    """"obj:state" -> (obj, state); разбор кэшируется, т.к. условия общие."""
+    obj_id, state = target.split(":")
+    return obj_id, state
+
+
+def _check_ability_level(cond: Condition, player: 'PlayerState') -> bool:
+    ability = player.abilities.get(cond.target)
+    if not ability:
+        return False
+    return ability.level >= int(cond.value)
+
+
+def _check_state(cond: Condition, player: 'PlayerState') -> bool:
+    obj_id, state = _split_state_target(cond.target)
+    return player.graph_diff.object_states.get(obj_id, {}).get("state") == state
+
+
+# ConditionType -> проверка (condition, player) -> bool; заменяет цепочку if/elif
+_CONDITION_CHECKS: Dict[ConditionType, Callable[[Condition, 'PlayerState'], bool]] = {
+    ConditionType.HAS_ITEM: lambda c, p: p.inventory.has_item(c.target),
+    ConditionType.HAS_ABILITY: lambda c, p: c.target in p.abilities,
+    ConditionType.ABILITY_LEVEL: _check_ability_level,
+    ConditionType.DEFEATED: lambda c, p: c.target in p.defeated_enemies,
+    ConditionType.AVOIDED: lambda c, p: c.target in p.avoided_enemies,
+    ConditionType.DISCOVERED: lambda c, p: c.target in p.discovered_locations,
+    ConditionType.STATE: _check_state,
+    ConditionType.OR: lambda c, p: any(p.check_condition(s) for s in c.sub_conditions),
+    ConditionType.AND: lambda c, p: all(p.check_condition(s) for s in c.sub_conditions),
+}
+
+
 @dataclass
 class PlayerState:
     """Полное состояние игрока."""
@@ -151,52 +201,28 @@ class PlayerState:
 
     # Respawn timers for per-player NPC respawns (npc_id -> epoch_seconds)
     respawn_timers: Dict[str, float] = field(default_factory=dict)
+    # Min-heap of (epoch_seconds, npc_id) mirroring respawn_timers; may hold stale entries
+    _respawn_heap: List[Tuple[float, str]] = field(default_factory=list, repr=False, compare=False)
     
     # Метаданные
     created_at: datetime = field(default_factory=datetime.now)
     last_activity: datetime = field(default_factory=datetime.now)
     play_time_seconds: int = 0
     
+    def __post_init__(self):
+        # Seed the heap from timers passed in at construction
+        if self.respawn_timers and not self._respawn_heap:
+            self._respawn_heap = [(ts, nid) for nid, ts in self.respawn_timers.items()]
+            heapq.heapify(self._respawn_heap)
+    
     # ============================================================
     # ПРОВЕРКИ УСЛОВИЙ
     # ============================================================
     
     def check_condition(self, condition: Condition) -> bool:
         """Проверяет выполнение условия."""
-        
-        if condition.type == ConditionType.HAS_ITEM:
-            return self.inventory.has_item(condition.target)
-        
-        elif condition.type == ConditionType.HAS_ABILITY:
-            return condition.target in self.abilities
-        
-        elif condition.type == ConditionType.ABILITY_LEVEL:
-            ability = self.abilities.get(condition.target)
-            if not ability:
-                return False
-            return ability.level >= int(condition.value)
-        
-        elif condition.type == ConditionType.DEFEATED:
-            return condition.target in self.defeated_enemies
-        
-        elif condition.type == ConditionType.AVOIDED:
-            return condition.target in self.avoided_enemies
-        
-        elif condition.type == ConditionType.DISCOVERED:
-            return condition.target in self.discovered_locations
-        
-        elif condition.type == ConditionType.STATE:
-            obj_id, state = condition.target.split(":")
-            obj_states = self.graph_diff.object_states.get(obj_id, {})
-            return obj_states.get("state") == state
-        
-        elif condition.type == ConditionType.OR:
-            return any(self.check_condition(c) for c in condition.sub_conditions)
-        
-        elif condition.type == ConditionType.AND:
-            return all(self.check_condition(c) for c in condition.sub_conditions)
-        
-        return False
+        check = _CONDITION_CHECKS.get(condition.type)
+        return check(condition, self) if check else False
     
     # ============================================================
     # ИЗМЕНЕНИЕ СОСТОЯНИЯ
@@ -261,8 +287,7 @@ class PlayerState:
     
     def unlock_path(self, from_node: str, to_node: str):
         """Разблокирует путь."""
-        edge_key = f"{from_node}:{to_node}"
-        self.graph_diff.unlocked_edges.add(edge_key)
+        self.graph_diff.unlocked_edges.add((from_node, to_node))
     
     def set_object_state(self, object_id: str, state: str):
         """Устанавливает состояние объекта."""
@@ -296,6 +321,7 @@ class PlayerState:
         """
         respawn_at = time.time() + int(delay_seconds)
         self.respawn_timers[npc_id] = respawn_at
+        heapq.heappush(self._respawn_heap, (respawn_at, npc_id))
         # ensure npc is marked as removed/defeated now
         self.defeated_enemies.add(npc_id)
         self.graph_diff.removed_nodes.add(npc_id)
@@ -308,10 +334,16 @@ class PlayerState:
         if now is None:
             now = time.time()
         respawned = []
-        expired = [nid for nid, ts in self.respawn_timers.items() if ts <= now]
+        heap = self._respawn_heap
+        expired = []
+        while heap and heap[0][0] <= now:
+            ts, nid = heapq.heappop(heap)
+            # Skip stale entries (timer rescheduled or already processed); popping the
+            # timer here makes duplicate (ts, nid) entries stale as well
+            if self.respawn_timers.get(nid) == ts:
+                del self.respawn_timers[nid]
+                expired.append(nid)
         for nid in expired:
-            # Remove respawn scheduling
-            del self.respawn_timers[nid]
             # Remove from defeated/removed sets so regeneration will re-add the NPC
             if nid in self.defeated_enemies:
                 self.defeated_enemies.remove(nid)
@@ -35,16 +35,20 @@ class WorldRegenerator:
             description=base_world.description
         )
 
-        # Copy all nodes
-        personalized.all_nodes = base_world.all_nodes.copy()
-        personalized.regions = base_world.regions.copy()
-        personalized.locations = base_world.locations.copy()
-        personalized.objects = base_world.objects.copy()
-        personalized.items = base_world.items.copy()
-        personalized.npcs = base_world.npcs.copy()
-        personalized.edges = base_world.edges.copy()
-        personalized.quest_chains = base_world.quest_chains.copy()
-        personalized.abilities = base_world.abilities.copy()
+        # Copy only the collections _apply_player_diffs mutates; the rest are
+        # shared read-only with the base world.
+        personalized.all_nodes = dict(base_world.all_nodes)
+        personalized.items = dict(base_world.items)
+        personalized.regions = base_world.regions
+        personalized.locations = base_world.locations
+        personalized.objects = base_world.objects
+        personalized.npcs = base_world.npcs
+        personalized.edges = base_world.edges
+        personalized._edge_keys = base_world._edge_keys
+        personalized._out_edges = base_world._out_edges
+        personalized._in_edges = base_world._in_edges
+        personalized.quest_chains = base_world.quest_chains
+        personalized.abilities = base_world.abilities
 
         # Apply player-specific changes
         self._apply_player_diffs(personalized, player_state)
@@ -57,10 +61,11 @@ class WorldRegenerator:
         logger.debug(f"Applying player diffs: {len(player_state.graph_diff.node_states)} node states, "
                     f"{len(player_state.graph_diff.removed_nodes)} removed nodes")
         
-        # Update node states based on player progress
+        # Update node states based on player progress. Nodes are shared with the
+        # base world (and other players), so record overrides on this world only.
         for node_id, state in player_state.graph_diff.node_states.items():
             if node_id in world.all_nodes:
-                world.all_nodes[node_id].state = state
+                world.player_node_states[node_id] = state
 
         # Remove collected items
         for removed_node in player_state.graph_diff.removed_nodes:
@@ -72,6 +77,6 @@ class WorldRegenerator:
         # Update object states
         for obj_id, states in player_state.graph_diff.object_states.items():
             if obj_id in world.all_nodes:
-                world.all_nodes[obj_id].custom_states.update(states)
+                world.player_object_states[obj_id] = {**world.all_nodes[obj_id].custom_states, **states}
         
         logger.debug("Player diffs applied successfully")
\ No newline at end of file
@@ -1,6 +1,19 @@
 import yaml
 from pathlib import Path
 from typing import List, Dict, Any, Optional
+from .loader import YamlLoader
+
+# PDDL fact templates (%-formatting is cheaper than f-strings for these simple cases)
+_CONNECTED = "(connected %s %s)"
+_LOCKED = "(locked %s)"
+_REQUIRES_CONCEPT = "(requires-concept %s %s)"
+_REQUIRES_COMBO = "(requires-combo %s %s %s)"
+_PROVIDES_CONCEPT = "(provides-concept %s %s)"
+_IN_CONTEXT = "(in-context %s %s)"
+_TRIGGER_YIELDS = "(trigger-yields %s %s)"
+_ACTIVE_CONTEXT = "(active-context %s %s)"
+_VISITED = "(visited %s)"
+_EXHAUSTED = "(exhausted %s)"
 
 class SocialPDDLGenerator:
     def __init__(self, config_dir: Path):
@@ -8,13 +21,19 @@ class SocialPDDLGenerator:
         self.contexts = {}
         self.concepts = {}
         self.triggers = {}
+        # Static PDDL fragments derived from contexts/concepts/triggers (see _build_static)
+        self._static_objects: Optional[List[str]] = None
+        self._static_init: List[str] = []
+        self._locked_contexts: List[str] = []
+        self._start_context: Optional[str] = None
         
     def load_world(self):
         # 1. Load Contexts
         ctx_dir = self.config_dir / "nodes" / "contexts"
         if ctx_dir.exists():
             for f in ctx_dir.glob("*.yaml"):
-                data = yaml.safe_load(f.read_text())
+                with f.open("r", encoding="utf-8") as fh:
+                    data = yaml.load(fh, Loader=YamlLoader)
                 self.contexts[data['id']] = data
         
         print(f"DEBUG: Loaded contexts: {list(self.contexts.keys())}")
@@ -23,25 +42,30 @@ class SocialPDDLGenerator:
         cpt_dir = self.config_dir / "nodes" / "concepts"
         if cpt_dir.exists():
             for f in cpt_dir.glob("*.yaml"):
-                data = yaml.safe_load(f.read_text())
+                with f.open("r", encoding="utf-8") as fh:
+                    data = yaml.load(fh, Loader=YamlLoader)
                 self.concepts[data['id']] = data
 
         # 3. Load Triggers
         trig_dir = self.config_dir / "nodes" / "triggers"
         if trig_dir.exists():
             for f in trig_dir.glob("*.yaml"):
-                data = yaml.safe_load(f.read_text())
+                with f.open("r", encoding="utf-8") as fh:
+                    data = yaml.load(fh, Loader=YamlLoader)
                 self.triggers[data['id']] = data
 
-    def generate_problem(self, player_id: str, goal_context_id: str, dynamic_state: Dict[str, Any] = None) -> str:
+        self._build_static()
+
+    def _build_static(self):
+        """Precomputes the parts of the problem that do not depend on dynamic state."""
         objects = []
         init = []
+        locked = []
         
         # 1. Define Objects
         objects.extend([f"{cid} - context" for cid in self.contexts])
         objects.extend([f"{cid} - concept" for cid in self.concepts])
         objects.extend([f"{tid} - trigger" for tid in self.triggers])
-        objects.append(f"{player_id} - agent")
         
         # 2. Init State (Static)
         
@@ -52,62 +76,72 @@ class SocialPDDLGenerator:
             # Links
             for conn in ctx.get('connections', []):
                 target = conn['to']
-                init.append(f"(connected {cid} {target})")
+                init.append(_CONNECTED % (cid, target))
                 if conn.get('direction') == 'bidirectional':
-                    init.append(f"(connected {target} {cid})")
+                    init.append(_CONNECTED % (target, cid))
             
-            # Locks
-            # If logic: locked only if NOT already unlocked in dynamic state
+            # Locks: emitted per call, skipping contexts unlocked in dynamic state
             if props.get('is_locked'):
-                 # Simple check: if dynamic state says it's unlocked, skip.
-                 # For now, let's assume PDDL handles unlocking via apply-concept action sequence.
-                 # But if we want persistence, we need to check dynamic_state['unlocked_contexts']
-                 is_unlocked = dynamic_state and cid in dynamic_state.get('unlocked_contexts', [])
-                 if not is_unlocked:
-                     init.append(f"(locked {cid})")
+                locked.append(cid)
             
             # Requirements
             if props.get('required_concept'):
-                init.append(f"(requires-concept {cid} {props['required_concept']})")
+                init.append(_REQUIRES_CONCEPT % (cid, props['required_concept']))
                 
             if props.get('required_combo'):
                 combo = props['required_combo']
                 if len(combo) == 2:
-                    init.append(f"(requires-combo {cid} {combo[0]} {combo[1]})")
+                    init.append(_REQUIRES_COMBO % (cid, combo[0], combo[1]))
                 
             # Passive Concept Provision
             if props.get('provides_concept'):
-                init.append(f"(provides-concept {cid} {props['provides_concept']})")
+                init.append(_PROVIDES_CONCEPT % (cid, props['provides_concept']))
 
         # Triggers placement
         for tid, trig in self.triggers.items():
             parent = trig.get('parent_context')
             if parent:
-                init.append(f"(in-context {tid} {parent})")
+                init.append(_IN_CONTEXT % (tid, parent))
             
             yields = trig.get('yields')
             if yields:
-                init.append(f"(trigger-yields {tid} {yields})")
+                init.append(_TRIGGER_YIELDS % (tid, yields))
+
+        self._static_objects = objects
+        self._static_init = init
+        self._locked_contexts = locked
+        self._start_context = next((cid for cid, c in self.contexts.items() if c.get('properties', {}).get('is_start')), None)
+
+    def generate_problem(self, player_id: str, goal_context_id: str, dynamic_state: Dict[str, Any] = None) -> str:
+        if self._static_objects is None:
+            self._build_static()
+        
+        objects = self._static_objects + [f"{player_id} - agent"]
+        init = list(self._static_init)
+        
+        # Locks
+        # If logic: locked only if NOT already unlocked in dynamic state
+        # For now, let's assume PDDL handles unlocking via apply-concept action sequence.
+        # But if we want persistence, we need to check dynamic_state['unlocked_contexts']
+        unlocked = dynamic_state.get('unlocked_contexts', []) if dynamic_state else []
+        for cid in self._locked_contexts:
+            if cid not in unlocked:
+                init.append(_LOCKED % cid)
 
         # 3. Dynamic State Injection
         if dynamic_state:
             curr = dynamic_state.get("current_context")
             if curr:
-                init.append(f"(active-context {player_id} {curr})")
+                init.append(_ACTIVE_CONTEXT % (player_id, curr))
             
-            for cpt in dynamic_state.get("concepts", []):
-                init.append(f"(has-concept {player_id} {cpt})")
-                
-            for v_ctx in dynamic_state.get("visited_contexts", []):
-                init.append(f"(visited {v_ctx})")
-                
-            for exh_trig in dynamic_state.get("exhausted_triggers", []):
-                init.append(f"(exhausted {exh_trig})")
+            has_concept = "(has-concept " + player_id + " "
+            init.extend([has_concept + cpt + ")" for cpt in dynamic_state.get("concepts", [])])
+            init.extend([_VISITED % v_ctx for v_ctx in dynamic_state.get("visited_contexts", [])])
+            init.extend([_EXHAUSTED % exh_trig for exh_trig in dynamic_state.get("exhausted_triggers", [])])
         else:
             # Fallback Start
-            start_ctx = next((cid for cid, c in self.contexts.items() if c.get('properties', {}).get('is_start')), None)
-            if start_ctx:
-                init.append(f"(active-context {player_id} {start_ctx})")
+            if self._start_context:
+                init.append(_ACTIVE_CONTEXT % (player_id, self._start_context))
         
         # 4. Construct PDDL
         pddl = f"""(define (problem narrative-journey)
@@ -1,26 +1,61 @@
+import io
 import sys
 from pathlib import Path
 import yaml
+from itertools import islice
+from typing import Dict, Hashable, Optional, TextIO, Tuple
 from engine.world.graph import WorldGraph, WorldNode, NodeType, LocationNode, ItemNode, NPCNode, Edge, EdgeType, Condition
 from engine.world.loader import load_world_from_flat_yaml
 
 
 
 # === Mermaid ===
-def graph_to_mermaid(world: WorldGraph) -> str:
-    lines = ["graph TD"]
+# Child node shapes/classes, in the order each location's items, NPCs and objects are written
+_CHILD_KINDS = ((("(", ")"), "itemClass"), (("[[", "]]"), "npcClass"), (("{", "}"), "objectClass"))
+
+def _contains_block(loc_id: str, nodes: Dict[str, WorldNode], shape: tuple, cls: str) -> str:
+    """Node declarations plus `contains` links for one location's children, as one chunk."""
+    open_, close_ = shape
+    return "".join(
+        f'        {node_id}{open_}"{node.name or node_id}"{close_}:::{cls}\n'
+        f'        {loc_id} -. contains .-> {node_id}\n'
+        for node_id, node in nodes.items()
+    )
+
+# revision -> (world, rendered diagram); holds the most recent in-memory render only
+_MERMAID_CACHE: Dict[Hashable, Tuple[WorldGraph, str]] = {}
+
+def graph_to_mermaid(world: WorldGraph, out: Optional[TextIO] = None, revision: Hashable = None) -> Optional[str]:
+    """Render the world as Mermaid.
+
+    With `out`, the diagram is written to it incrementally and None is
+    returned; otherwise it is built in memory and returned as a string.
+    Pass `revision` (any value the caller changes whenever the world
+    changes) to cache in-memory renders of that world; a streamed render
+    reuses a cached diagram but does not populate the cache.
+    """
+    cached = _MERMAID_CACHE.get(revision) if revision is not None else None
+    if cached is not None and cached[0] is world:
+        if out is None:
+            return cached[1]
+        out.write(cached[1])
+        return None
+
+    buf = out if out is not None else io.StringIO()
+    write = buf.write
+    write("graph TD\n")
     
     # Define classes for different link types
-    lines.append("    classDef pathClass stroke:#00ff00,stroke-width:2px")  # Green for paths
-    lines.append("    classDef containsClass stroke:#0000ff,stroke-dasharray: 5 5")  # Blue dashed for contains
-    lines.append("    classDef linkClass stroke:#ff0000,stroke-width:3px")  # Red for links
-    lines.append("    classDef hasClass stroke:#ffa500,stroke-dasharray: 10 5")  # Orange dashed for has
+    write("    classDef pathClass stroke:#00ff00,stroke-width:2px\n")  # Green for paths
+    write("    classDef containsClass stroke:#0000ff,stroke-dasharray: 5 5\n")  # Blue dashed for contains
+    write("    classDef linkClass stroke:#ff0000,stroke-width:3px\n")  # Red for links
+    write("    classDef hasClass stroke:#ffa500,stroke-dasharray: 10 5\n")  # Orange dashed for has
     
     # Define classes for node types
-    lines.append("    classDef locationClass stroke:#00ff00,stroke-width:2px")  # Light blue for locations
-    lines.append("    classDef itemClass stroke:#0000ff,stroke-dasharray: 5 5")  # Light green for items
-    lines.append("    classDef npcClass stroke:#ff0000,stroke-width:3px")  # Light pink for NPCs
-    lines.append("    classDef objectClass stroke:#ffa500,stroke-dasharray: 10 5")  # Plum for objects
+    write("    classDef locationClass stroke:#00ff00,stroke-width:2px\n")  # Light blue for locations
+    write("    classDef itemClass stroke:#0000ff,stroke-dasharray: 5 5\n")  # Light green for items
+    write("    classDef npcClass stroke:#ff0000,stroke-width:3px\n")  # Light pink for NPCs
+    write("    classDef objectClass stroke:#ffa500,stroke-dasharray: 10 5\n")  # Plum for objects
     
     link_index = 0
     path_indices = []
@@ -30,42 +65,29 @@ def graph_to_mermaid(world: WorldGraph) -> str:
 
     for region_id, region in world.regions.items():
         region_name = region.name or region_id
-        lines.append(f'    subgraph {region_id}["{region_name}"]')
+        write(f'    subgraph {region_id}["{region_name}"]\n')
 
         for loc_id in world.region_to_locations.get(region_id, []):
             loc = world.locations.get(loc_id)
             if not loc:
                 continue
             loc_name = loc.name or loc_id
-            lines.append(f'        {loc_id}("{loc_name}"):::locationClass')
-
-            for item_id, item in loc.items.items():
-                name = item.name or item_id
-                lines.append(f'        {item_id}("{name}"):::itemClass')
-                lines.append(f'        {loc_id} -. contains .-> {item_id}')
-                contains_indices.append(link_index)
-                link_index += 1
-
-            for npc_id, npc in loc.npcs.items():
-                name = npc.name or npc_id
-                lines.append(f'        {npc_id}[["{name}"]]:::npcClass')
-                lines.append(f'        {loc_id} -. contains .-> {npc_id}')
-                contains_indices.append(link_index)
-                link_index += 1
-
-            for obj_id, obj in loc.objects.items():
-                name = obj.name or obj_id
-                lines.append(f'        {obj_id}{{"{name}"}}:::objectClass')
-                lines.append(f'        {loc_id} -. contains .-> {obj_id}')
-                contains_indices.append(link_index)
-                link_index += 1
-
-        lines.append("    end")
+            write(f'        {loc_id}("{loc_name}"):::locationClass\n')
+
+            # Items, NPCs, objects: one contains-link each, numbered consecutively
+            n_children = 0
+            for nodes, (shape, cls) in zip((loc.items, loc.npcs, loc.objects), _CHILD_KINDS):
+                write(_contains_block(loc_id, nodes, shape, cls))
+                n_children += len(nodes)
+            contains_indices.extend(range(link_index, link_index + n_children))
+            link_index += n_children
+
+        write("    end\n")
 
     for edge in world.edges:
         direction = "<-->" if edge.bidirectional else "-->"
         label = edge.edge_type.value
-        lines.append(f'    {edge.from_node} {direction}|{label}| {edge.to_node}')
+        write(f'    {edge.from_node} {direction}|{label}| {edge.to_node}\n')
         path_indices.append(link_index)
         link_index += 1
 
@@ -73,12 +95,12 @@ def graph_to_mermaid(world: WorldGraph) -> str:
     for item in world.items.values():
         linked = item.properties.get('linked_object')
         if linked:
-            lines.append(f'    {item.id} -->|linked| {linked}')
+            write(f'    {item.id} -->|linked| {linked}\n')
             link_indices.append(link_index)
             link_index += 1
         linked_npcs = item.properties.get('linked_npcs', [])
         for npc_id in linked_npcs:
-            lines.append(f'    {item.id} -->|linked| {npc_id}')
+            write(f'    {item.id} -->|linked| {npc_id}\n')
             link_indices.append(link_index)
             link_index += 1
 
@@ -86,31 +108,40 @@ def graph_to_mermaid(world: WorldGraph) -> str:
     for npc in world.npcs.values():
         has_items = npc.properties.get('has_items', [])
         for item_id in has_items:
-            lines.append(f'    {npc.id} -. has .-> {item_id}')
+            write(f'    {npc.id} -. has .-> {item_id}\n')
             has_indices.append(link_index)
             link_index += 1
 
-    # Apply link styles
-    for idx in path_indices:
-        lines.append(f"    linkStyle {idx} stroke:#00ff00,stroke-width:2px")
-    for idx in contains_indices:
-        lines.append(f"    linkStyle {idx} stroke:#0000ff,stroke-dasharray: 5 5")
-    for idx in link_indices:
-        lines.append(f"    linkStyle {idx} stroke:#ff0000,stroke-width:3px")
-    for idx in has_indices:
-        lines.append(f"    linkStyle {idx} stroke:#ffa500,stroke-dasharray: 10 5")
-
-    return "\n".join(lines)
+    # Apply link styles: one comma-separated linkStyle line per group
+    for indices, style in (
+        (path_indices, "stroke:#00ff00,stroke-width:2px"),
+        (contains_indices, "stroke:#0000ff,stroke-dasharray: 5 5"),
+        (link_indices, "stroke:#ff0000,stroke-width:3px"),
+        (has_indices, "stroke:#ffa500,stroke-dasharray: 10 5"),
+    ):
+        if indices:
+            write(f"    linkStyle {','.join(map(str, indices))} {style}\n")
+
+    if out is not None:
+        return None
+    result = buf.getvalue()
+    if revision is not None:
+        _MERMAID_CACHE.clear()
+        _MERMAID_CACHE[revision] = (world, result)
+    return result
+
+PREVIEW_LINES = 40
 
 def main():
     world_path = Path("config/world/")
     world = load_world_from_flat_yaml(world_path)
-    mermaid_code = graph_to_mermaid(world)
-    with open("../generated/world_graph.md", "w", encoding="utf-8") as f:
-        f.write(mermaid_code)
+    output_path = Path("../generated/world_graph.md")
+    with open(output_path, "w", encoding="utf-8") as f:
+        graph_to_mermaid(world, out=f)
     print("Mermaid graph saved to generated/world_graph.mmd")
-    print("\nPreview:")
-    print(mermaid_code)
+    print(f"\nPreview (first {PREVIEW_LINES} lines):")
+    with open(output_path, encoding="utf-8") as f:
+        sys.stdout.writelines(islice(f, PREVIEW_LINES))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """FastAPI version of NPC Engine for HTTP API access."""
 
+import re
 import sys
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Tuple, Optional, List
 import json
@@ -15,7 +18,7 @@ from engine.logging_config import logging_manager
 logging_manager.setup_all_loggers()
 
 from engine.world.graph import WorldGraph, WorldNode, NodeType, LocationNode, ItemNode, NPCNode, Edge, EdgeType, Condition
-from engine.world.player_state import PlayerState
+from engine.world.player_state import GraphDiff, PlayerState
 from engine.world.regenerator import WorldRegenerator
 from engine.master.pddl_orchestrator import PDDLOrchestrator
 from engine.master.planner import MasterPlanner
@@ -23,9 +26,12 @@ from engine.master.quest_generator import QuestGenerator
 from engine.world.loader import load_world_from_flat_yaml
 from engine.master.hooks.registry import execute_hook # Added
 import engine.master.hooks.quest_hooks # Ensure hooks are registered
+from engine import json_compat
 from version import __version__
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 # Constants
@@ -33,17 +39,27 @@ BASE_DIR = Path(__file__).resolve().parent
 WORLD_CONFIG_PATH = BASE_DIR / "config" / "world"
 DEFAULT_PLAYER_ID = "player_001"
 DEFAULT_LOCATION = "forest_entrance"
+EXIT_EDGE_TYPES = frozenset({"path", "door", "leads_to"})
+HAS_ITEM_GOAL_RE = re.compile(r'\(has-item\s+\w+\s+(\w+)\)')
 
-app = FastAPI(title="NPC Engine API", version=__version__)
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (via json_compat), skipping jsonable_encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return json_compat.dumps(content)
+
+app = FastAPI(title="NPC Engine API", version=__version__, default_response_class=ORJSONResponse)
 
 # Initialize services
 # No global services for dialogue anymore, logic is handled via PDDLOrchestrator per request
 
 # --- Pydantic Models ---
+# Documents the /process body in OpenAPI; the handler checks the two fields by hand
 class ProcessRequest(BaseModel):
     input_json: Dict[str, Any]
     oracle_mode: bool = False
 
+# Documents the /process response in OpenAPI; never constructed at runtime
 class ProcessResponse(BaseModel):
     status: str
     metadata: Dict[str, Any]
@@ -75,19 +91,16 @@ def load_player_from_json_data(data: Dict[str, Any]) -> Tuple[PlayerState, Optio
     )
     
     # Load abilities
+    add_ability = player.add_ability
     for ab_id, level in data.get("abilities", {}).items():
-        player.add_ability(ab_id, int(level))
+        add_ability(ab_id, int(level))
         
-    # Load inventory
+    # Load inventory: new nested format ({"items": {...}}) or old flat format
     inventory_data = data.get("inventory", {})
-    if "items" in inventory_data:
-        # New nested format
-        for item_id, count in inventory_data["items"].items():
-            player.inventory.add_item(item_id, int(count))
-    else:
-        # Old flat format
-        for item_id, count in inventory_data.items():
-            player.inventory.add_item(item_id, int(count))
+    items = inventory_data["items"] if "items" in inventory_data else inventory_data
+    add_item = player.inventory.add_item
+    for item_id, count in items.items():
+        add_item(item_id, int(count))
         
     # Load knowledge
     knowledge = data.get("knowledge", {})
@@ -108,40 +121,101 @@ def load_player_from_json_data(data: Dict[str, Any]) -> Tuple[PlayerState, Optio
     goal = data.get("goal")
     return player, goal
 
-def load_world() -> WorldGraph:
-    """Load the world from config."""
+def _world_config_signature() -> Tuple[int, int]:
+    """(file count, newest mtime) of the world YAML files; changes when the config is edited."""
+    mtimes = [p.stat().st_mtime_ns for p in WORLD_CONFIG_PATH.rglob("*.yaml")]
+    return len(mtimes), max(mtimes, default=0)
+
+@lru_cache(maxsize=1)
+def _cached_world(signature: Tuple[int, int]) -> WorldGraph:
     return load_world_from_flat_yaml(WORLD_CONFIG_PATH)
 
+def load_world() -> WorldGraph:
+    """Load the world from config.
+
+    The parsed graph is cached per process and reused until the YAML files
+    change. Callers treat it as read-only (the regenerator builds a separate
+    personalized graph).
+    """
+    return _cached_world(_world_config_signature())
+
+# Personalized worlds keyed by (id(base world), graph diff); values keep the base
+# world alongside so a recycled id() never matches a different graph
+_REGEN = WorldRegenerator()
+_REGEN_CACHE: Dict[tuple, Tuple[WorldGraph, WorldGraph]] = {}
+_REGEN_CACHE_SIZE = 64
+
+def _bounded_put(cache: Dict[Any, Any], key: Any, value: Any, size: int = _REGEN_CACHE_SIZE) -> None:
+    """Insert into a per-world cache, evicting the oldest entry when full."""
+    if len(cache) >= size:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+def _graph_diff_key(diff: GraphDiff) -> tuple:
+    """Hashable snapshot of the parts of a GraphDiff the regenerator applies."""
+    return (
+        frozenset(diff.node_states.items()),
+        frozenset(diff.removed_nodes),
+        frozenset((obj_id, frozenset(states.items())) for obj_id, states in diff.object_states.items()),
+    )
+
+def regenerate_world(world: WorldGraph, player: PlayerState) -> WorldGraph:
+    """Personalized world for the player, reused while the base world and diff are unchanged."""
+    if player.respawn_timers:
+        # Respawn processing updates the player itself, so always run it
+        return _REGEN.regenerate(world, player)
+    key = (id(world), _graph_diff_key(player.graph_diff))
+    cached = _REGEN_CACHE.get(key)
+    if cached is not None and cached[0] is world:
+        return cached[1]
+    personalized = _REGEN.regenerate(world, player)
+    _bounded_put(_REGEN_CACHE, key, (world, personalized))
+    return personalized
+
+# Planning services hold only configuration (template env, output dir, action
+# config), so one instance per process is reused; built on first use
+@lru_cache(maxsize=None)
+def _pddl_orchestrator() -> PDDLOrchestrator:
+    return PDDLOrchestrator()
+
+@lru_cache(maxsize=None)
+def _master_planner() -> MasterPlanner:
+    return MasterPlanner()
+
+@lru_cache(maxsize=None)
+def _quest_generator() -> QuestGenerator:
+    return QuestGenerator()
+
 def collect_location_data(world: WorldGraph, location_id: str, goal: Optional[str] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
     """Collect NPCs, exits, and items for a given location."""
     npcs_nearby = []
     exits = []
     items_nearby = []
     
-    current_loc_node = world.get_node(location_id)
+    get_node = world.all_nodes.get
+    current_loc_node = get_node(location_id)
     if current_loc_node and isinstance(current_loc_node, LocationNode):
         # Collect NPCs
         for npc_id in current_loc_node.contained_npcs:
-            npc_node = world.get_node(npc_id)
+            npc_node = get_node(npc_id)
             if npc_node:
+                props = npc_node.properties
                 npcs_nearby.append({
                     "id": npc_id,
                     "name": getattr(npc_node, 'name', npc_id),
                     "description": getattr(npc_node, 'description', ""),
                     "personality": getattr(npc_node, 'personality', ""),
                     "speech_style": getattr(npc_node, 'speech_style', ""),
-                    "items": npc_node.properties.get("has_items", []),
-                    "dialogue_quest": npc_node.properties.get("dialogue_quest", False),
-                    "social_persona": npc_node.properties.get("social_persona", "persona_cyber")
+                    "items": props.get("has_items", []),
+                    "dialogue_quest": props.get("dialogue_quest", False),
+                    "social_persona": props.get("social_persona", "persona_cyber")
                 })
         
-        # Collect Exits
-        connections = world.get_connections_from(location_id)
-        for edge in connections:
+        # Collect Exits (EdgeType is a str enum, so it matches the plain-string set)
+        for edge in world.get_connections_from(location_id):
             target_id = edge.to_node
-            target_node = world.get_node(target_id)
-            e_type = edge.edge_type.value if hasattr(edge.edge_type, 'value') else str(edge.edge_type)
-            if target_node and e_type in ["path", "door", "leads_to"]:
+            target_node = get_node(target_id)
+            if target_node and edge.edge_type in EXIT_EDGE_TYPES:
                 exits.append({
                     "id": target_id,
                     "name": getattr(target_node, 'name', target_id)
@@ -149,14 +223,13 @@ def collect_location_data(world: WorldGraph, location_id: str, goal: Optional[st
         
         goal_item_id = None
         if goal and goal.startswith("(has-item"):
-            import re
-            match = re.search(r'\(has-item\s+\w+\s+(\w+)\)', goal)
+            match = HAS_ITEM_GOAL_RE.search(goal)
             if match:
                 goal_item_id = match.group(1)
 
         # Collect Items
         for item_id in current_loc_node.contained_items:
-            item_node = world.get_node(item_id)
+            item_node = get_node(item_id)
             if item_node:
                 items_nearby.append({
                     "id": item_id,
@@ -176,8 +249,7 @@ def generate_plan_and_quest(world: WorldGraph, player: PlayerState, goal: Option
         all_location_ids = [node_id for node_id, node in world.all_nodes.items() if node.type == NodeType.LOCATION]
         player.discovered_locations.update(all_location_ids)
     else:
-        regenerator = WorldRegenerator()
-        target_world = regenerator.regenerate(world, player)
+        target_world = regenerate_world(world, player)
     
     if not goal:
         return None, [], "No goal specified."
@@ -188,38 +260,53 @@ def generate_plan_and_quest(world: WorldGraph, player: PlayerState, goal: Option
     else:
         mode = "exploration"
     
-    logger.info("About to create PDDLOrchestrator")
-    pddl_orchestrator = PDDLOrchestrator()
-    logger.info("PDDLOrchestrator created, calling generate")
-    domain, problem = pddl_orchestrator.generate(mode, player, target_world, goal)
+    logger.info("Generating PDDL via PDDLOrchestrator")
+    domain, problem = _pddl_orchestrator().generate(mode, player, target_world, goal)
     
-    planner = MasterPlanner()
-    plan_result, diagnosis_msg = planner.solve(domain, problem, player.player_id, player_state=player)
+    plan_result, diagnosis_msg = _master_planner().solve(domain, problem, player.player_id, player_state=player)
     
     if plan_result is None:
         return None, [], diagnosis_msg
     
     try:
-        quest_gen = QuestGenerator()
-        quest_steps = quest_gen.generate_quest(plan_result)
+        quest_steps = _quest_generator().generate_quest(plan_result)
     except Exception as e:
         logger.error(f"Failed to generate quest descriptions: {e}")
         quest_steps = [{"step_number": i, "description": step, "action": step.split()[0] if step.split() else "unknown"} for i, step in enumerate(plan_result, 1)]
     
     return plan_result, quest_steps, diagnosis_msg if len(plan_result) == 0 else ""
 
+# (id, name) of every item per world, keyed by id(world) like _REGEN_CACHE
+_QUEST_TEMPLATES: Dict[int, Tuple[WorldGraph, Tuple[Tuple[str, str], ...]]] = {}
+
+def _quest_templates(world: WorldGraph) -> Tuple[Tuple[str, str], ...]:
+    cached = _QUEST_TEMPLATES.get(id(world))
+    if cached is not None and cached[0] is world:
+        return cached[1]
+    templates = tuple((item_node.id, item_node.name) for item_node in world.items.values())
+    _bounded_put(_QUEST_TEMPLATES, id(world), (world, templates))
+    return templates
+
 def collect_available_quests(world: WorldGraph, player: PlayerState) -> List[Dict[str, Any]]:
     """Generate list of available quests."""
-    available_quests = []
-    player_items = set(player.inventory.items.keys())
-    for item_node in world.items.values():
-        if item_node.id not in player_items:
-            available_quests.append({
-                "id": item_node.id,
-                "name": item_node.name,
-                "goal": f"(has-item {player.player_id} {item_node.id})"
-            })
-    return available_quests
+    player_items = player.inventory.items
+    goal_prefix = f"(has-item {player.player_id} "
+    return [
+        {"id": item_id, "name": name, "goal": goal_prefix + item_id + ")"}
+        for item_id, name in _quest_templates(world)
+        if item_id not in player_items
+    ]
+
+# [epoch millisecond, ISO timestamp] of the last formatted response timestamp
+_TIMESTAMP_CACHE: List[Any] = [0, ""]
+
+def _response_timestamp() -> str:
+    """Local ISO timestamp at millisecond resolution, formatted at most once per millisecond."""
+    now_ms = time.time_ns() // 1_000_000
+    if now_ms != _TIMESTAMP_CACHE[0]:
+        _TIMESTAMP_CACHE[0] = now_ms
+        _TIMESTAMP_CACHE[1] = datetime.fromtimestamp(now_ms / 1000).isoformat(timespec="milliseconds")
+    return _TIMESTAMP_CACHE[1]
 
 def process_request(input_data: Dict[str, Any], oracle_mode: bool = False) -> Dict[str, Any]:
     """Process the input JSON data and return result dict."""
@@ -240,7 +327,7 @@ def process_request(input_data: Dict[str, Any], oracle_mode: bool = False) -> Di
             "status": status,
             "metadata": {
                 "version": __version__,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _response_timestamp(),
                 "player_id": player.player_id,
                 "goal": goal,
                 "location": player.current_location,
@@ -261,7 +348,7 @@ def process_request(input_data: Dict[str, Any], oracle_mode: bool = False) -> Di
             "status": "error",
             "metadata": {
                 "version": __version__,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _response_timestamp(),
                 "player_id": input_data.get("id", "unknown"),
                 "goal": input_data.get("goal", "unknown")
             },
@@ -272,11 +359,39 @@ def process_request(input_data: Dict[str, Any], oracle_mode: bool = False) -> Di
         }
 
 # --- API Endpoints ---
-@app.post("/process", response_model=ProcessResponse)
-async def process_endpoint(request: ProcessRequest):
+_PROCESS_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": ProcessRequest.model_json_schema()}},
+    }
+}
+
+@app.post(
+    "/process",
+    response_class=ORJSONResponse,
+    responses={200: {"model": ProcessResponse}},
+    openapi_extra=_PROCESS_REQUEST_BODY,
+)
+async def process_endpoint(request: Request):
     """Process NPC Engine request."""
-    result = process_request(request.input_json, oracle_mode=request.oracle_mode)
-    return ProcessResponse(**result)
+    try:
+        data = json_compat.loads(await request.body())
+    except json_compat.JSONDecodeError:
+        raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": "JSON decode error", "input": {}}])
+    if not isinstance(data, dict):
+        raise RequestValidationError([{"type": "dict_type", "loc": ("body",), "msg": "Input should be a valid dictionary", "input": data}])
+    input_json = data.get("input_json")
+    oracle_mode = data.get("oracle_mode", False)
+    errors = []
+    if not isinstance(input_json, dict):
+        errors.append({"type": "dict_type", "loc": ("body", "input_json"), "msg": "Input should be a valid dictionary", "input": input_json})
+    if not isinstance(oracle_mode, bool):
+        errors.append({"type": "bool_type", "loc": ("body", "oracle_mode"), "msg": "Input should be a valid boolean", "input": oracle_mode})
+    if errors:
+        raise RequestValidationError(errors)
+    result = process_request(input_json, oracle_mode=oracle_mode)
+    # process_request already returns the ProcessResponse shape; serialize it directly
+    return ORJSONResponse(content=result)
 
 if __name__ == "__main__":
     import uvicorn
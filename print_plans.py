@@ -1,10 +1,10 @@
-import json
 import sys
 
+from npc_engine.engine import json_compat
+
 def print_plans(json_file):
     try:
-        with open(json_file, 'r') as f:
-            data = json.load(f)
+        data = json_compat.load_file(json_file)
         
         plans = data.get('plans', [])
         total = data.get('total', len(plans))
@@ -19,7 +19,7 @@ def print_plans(json_file):
     
     except FileNotFoundError:
         print(f"Error: File '{json_file}' not found.")
-    except json.JSONDecodeError:
+    except json_compat.JSONDecodeError:
         print(f"Error: Invalid JSON in '{json_file}'.")
     except Exception as e:
         print(f"Error: {e}")
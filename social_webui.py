@@ -1,6 +1,6 @@
+import copy
 import streamlit as st
 import sys
-import json
 import requests
 from pathlib import Path
 
@@ -23,6 +23,7 @@ from gamemaster.engine_core import GameEngine
 from npc_engine.engine.master.pddl_orchestrator import PDDLOrchestrator
 from npc_engine.engine.master.hooks.registry import execute_hook
 from npc_engine.main_fast import load_player_from_json_data, load_world
+from npc_engine.engine import json_compat
 
 # Import our modules
 from npc_engine.engine.webui.social_web_libs import analyze_quest_difficulty, save_player_state, sync_world, API_URL, PLAYER_STATE_FILE
@@ -32,66 +33,65 @@ from npc_engine.engine.webui.social_web_render import render_sidebar, render_rig
 st.set_page_config(page_title="DAQS v5.0: Unified World", page_icon="🌍", layout="wide")
 
 # --- INITIALIZATION FUNCTIONS ---
+# Session defaults; deep-copied on use because the UI mutates nested lists in place
+_DEFAULT_PLAYER_DATA = {
+    "id": "player_001",
+    "location": "forest_entrance",
+    "inventory": {"items": {}},
+    "knowledge": {"discovered_locations": ["forest_entrance"], "visited_locations": ["forest_entrance"]}
+}
+
+# State for the Dialogue Engine
+_DEFAULT_SOCIAL_STATE = {
+    "current_context": "ctx_intro",
+    "active_persona": "persona_cyber",
+    "current_mood": "neutral",
+    "concepts": [],
+    "visited_contexts": ["ctx_intro"],
+    "unlocked_contexts": [],
+    "exhausted_triggers": [],
+    "shared_items": [],
+    "rapport": False,
+    "known_facts": []
+}
+
+def _load_player_data() -> dict:
+    """Player data from PLAYER_STATE_FILE (knowledge lists always present), or a new game."""
+    if not PLAYER_STATE_FILE.exists():
+        st.warning("Player state file missing. Initializing new game.")
+        default_data = copy.deepcopy(_DEFAULT_PLAYER_DATA)
+        save_player_state(default_data)
+        return default_data
+    try:
+        data = json_compat.load_file(PLAYER_STATE_FILE)
+        # Defensive init for knowledge lists
+        data["knowledge"] = {"discovered_locations": [], "visited_locations": [], **data.get("knowledge", {})}
+        return data
+    except Exception as e:
+        st.error(f"Error loading player state: {e}")
+        return copy.deepcopy(_DEFAULT_PLAYER_DATA)
+
 def init_session_state():
     """Initialize all session state variables."""
-    if "engine" not in st.session_state:
-        st.session_state.engine = GameEngine(CONFIG_DIR)
-
-    if "game_mode" not in st.session_state:
-        st.session_state.game_mode = "WORLD"  # WORLD | SOCIAL
-
-    if "player_data" not in st.session_state:
-        default_data = {
-            "id": "player_001",
-            "location": "forest_entrance",
-            "inventory": {"items": {}},
-            "knowledge": {"discovered_locations": ["forest_entrance"], "visited_locations": ["forest_entrance"]}
-        }
-        
-        if PLAYER_STATE_FILE.exists():
-            try:
-                with open(PLAYER_STATE_FILE, 'r') as f:
-                    data = json.load(f)
-                    # Defensive init for knowledge lists
-                    if "knowledge" not in data: data["knowledge"] = {}
-                    if "discovered_locations" not in data["knowledge"]: data["knowledge"]["discovered_locations"] = []
-                    if "visited_locations" not in data["knowledge"]: data["knowledge"]["visited_locations"] = []
-                    st.session_state.player_data = data
-            except Exception as e:
-                st.error(f"Error loading player state: {e}")
-                st.session_state.player_data = default_data
-        else:
-            st.warning("Player state file missing. Initializing new game.")
-            st.session_state.player_data = default_data
-            save_player_state(default_data)
-
-    if "world_cache" not in st.session_state:
-        st.session_state.world_cache = {}
-
-    if "world_messages" not in st.session_state:
-        st.session_state.world_messages = []  # History for World Mode
-
-    if "social_messages" not in st.session_state:
-        st.session_state.social_messages = []  # History for Social Mode
-
-    if "social_state" not in st.session_state:
-        # State for the Dialogue Engine
-        st.session_state.social_state = {
-            "current_context": "ctx_intro",
-            "active_persona": "persona_cyber",
-            "current_mood": "neutral",
-            "concepts": [],
-            "visited_contexts": ["ctx_intro"],
-            "unlocked_contexts": [],
-            "exhausted_triggers": [],
-            "shared_items": [],
-            "rapport": False,
-            "known_facts": []
-        }
+    state = st.session_state
+    if "engine" not in state:
+        state.engine = GameEngine(CONFIG_DIR)
+
+    state.setdefault("game_mode", "WORLD")  # WORLD | SOCIAL
+
+    # Disk read and any warning only happen on the first run of a session
+    if "player_data" not in state:
+        state.player_data = _load_player_data()
+
+    state.setdefault("world_cache", {})
+    state.setdefault("world_messages", [])  # History for World Mode
+    state.setdefault("social_messages", [])  # History for Social Mode
+
+    if "social_state" not in state:
+        state.social_state = copy.deepcopy(_DEFAULT_SOCIAL_STATE)
 
     # VISUAL MODE FLAG
-    if "visual_enabled" not in st.session_state:
-        st.session_state.visual_enabled = "--visual" in sys.argv
+    state.setdefault("visual_enabled", "--visual" in sys.argv)
 
 # Initialize session state
 init_session_state()
@@ -1,12 +1,12 @@
 import os
 import yaml
-import json
 import re
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
 from google import genai
 from openai import OpenAI
+from npc_engine.engine import json_compat
 
 try:
     from langgraph.graph import StateGraph, END
@@ -24,6 +24,18 @@ GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
 
 CONFIG_PATH = Path("npc_engine/config/social_world/nodes/personas/elves.yaml")
 PLAYER_STATE_PATH = Path("player_state.json")
+ID_RE = re.compile(r"(trig_|ctx_)[a-zA-Z0-9_]+")
+
+# Parsed player_state.json, reused until the file's mtime/size changes
+_PS_CACHE: Dict[str, Any] = {"stamp": None, "data": None}
+
+def _load_player_state() -> Dict[str, Any]:
+    st = PLAYER_STATE_PATH.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    if stamp != _PS_CACHE["stamp"]:
+        _PS_CACHE["data"] = json_compat.load_file(PLAYER_STATE_PATH)
+        _PS_CACHE["stamp"] = stamp
+    return _PS_CACHE["data"]
 
 class StrategicNPCEngine:
     def __init__(self):
@@ -31,22 +43,25 @@ class StrategicNPCEngine:
         self.persona = atlas["personas"][0]
         self.contexts = {c["id"]: c for c in self.persona["contexts"]}
         self.triggers = {t["id"]: t for t in self.persona["triggers"]}
+        # Trigger/context IDs are fixed per persona, so the NLU option list is built once
+        self._options_str = "\n".join(
+            [f"ID: {tid} | {t.get('name') or tid}" for tid, t in self.triggers.items()]
+            + [f"ID: {cid} | {c.get('name') or cid}" for cid, c in self.contexts.items()]
+        )
         self.graph = self._build_graph()
 
     def _get_real_inventory(self) -> List[str]:
         try:
-            data = json.loads(PLAYER_STATE_PATH.read_text())
+            data = _load_player_state()
             return [k for k, v in data.get("inventory", {}).get("items", {}).items() if v > 0]
         except: return []
 
     def nlu(self, player_input: str, state: Dict[str, Any]) -> str:
-        options = [f"ID: {tid} | {self.triggers[tid].get('name') or tid}" for tid in self.triggers]
-        options += [f"ID: {cid} | {self.contexts[cid].get('name') or cid}" for cid in self.contexts]
-        
         prompt = f"""
         PLAYER INPUT: "{player_input}"
         CONTEXT: {state['current_context']}
-        AVAILABLE IDs: {options}
+        AVAILABLE IDs:
+{self._options_str}
         
         TASK: Return ONLY the ID string.
         - If they mention 'shadow coin' or 'black iron', pick 'trig_find_coin'.
@@ -54,7 +69,7 @@ class StrategicNPCEngine:
         """
         try:
             res = gemini_client.models.generate_content(model=GEMINI_MODEL, contents=prompt).text.strip()
-            match = re.search(r"(trig_|ctx_)[a-zA-Z0-9_]+", res)
+            match = ID_RE.search(res)
             return match.group(0) if match else "None"
         except: return "None"
 
@@ -96,11 +111,13 @@ class StrategicNPCEngine:
                     new_state["rejection_reason"] = f"Missing {req}"
                 else:
                     new_state["current_context"] = trig["parent_context"]
-                    if trig.get("yields"): new_state["concepts"] = list(set(concepts) | {trig["yields"]})
+                    yielded = trig.get("yields")
+                    if yielded and yielded not in concepts:
+                        concepts = new_state["concepts"] = concepts + [yielded]
             elif next_step in self.contexts:
                 new_state["current_context"] = next_step
             
-            if "cpt_agreement" in new_state["concepts"]: new_state["current_context"] = "ctx_joined"
+            if "cpt_agreement" in concepts: new_state["current_context"] = "ctx_joined"
             return new_state
         sg.add_node("gate", logic_gate); sg.set_entry_point("gate"); sg.add_edge("gate", END)
         return sg.compile()
@@ -108,7 +125,7 @@ class StrategicNPCEngine:
 def grok_reactive_act(history: List[str], last_npc_msg: str) -> str:
     # Грок видит свой инвентарь (в первом тесте монеты НЕТ)
     try:
-        data = json.loads(PLAYER_STATE_PATH.read_text())
+        data = _load_player_state()
         inv = [f"{k} (quantity: {v})" for k, v in data.get("inventory", {}).get("items", {}).items() if v > 0]
     except: inv = ["Nothing"]
 
@@ -152,15 +169,15 @@ def run_simulation(label: str):
 
 if __name__ == "__main__":
     # TEST 1: NO COIN
-    with open(PLAYER_STATE_PATH, "r") as f: d = json.load(f)
+    d = json_compat.load_file(PLAYER_STATE_PATH)
     if "item_shadow_coin" in d["inventory"]["items"]:
         del d["inventory"]["items"]["item_shadow_coin"]
-    with open(PLAYER_STATE_PATH, "w") as f: json.dump(d, f, indent=2)
+    json_compat.dump_file(d, PLAYER_STATE_PATH)
     run_simulation("TEST WITHOUT COIN")
 
     # TEST 2: WITH COIN
     print("\n" + "="*50 + "\nAdding coin...")
-    with open(PLAYER_STATE_PATH, "r") as f: d = json.load(f)
+    d = json_compat.load_file(PLAYER_STATE_PATH)
     d["inventory"]["items"]["item_shadow_coin"] = 1
-    with open(PLAYER_STATE_PATH, "w") as f: json.dump(d, f, indent=2)
+    json_compat.dump_file(d, PLAYER_STATE_PATH)
     run_simulation("TEST WITH COIN")
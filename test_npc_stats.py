@@ -1,15 +1,19 @@
 import os
+import sys
+import argparse
 import yaml
 import json
 import re
+import hashlib
+from functools import lru_cache
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, FrozenSet, List, Optional, Set, Tuple
+import numpy as np
 from dotenv import load_dotenv
-
-try:
-    from langgraph.graph import StateGraph, END
-except ImportError:
-    raise SystemExit("langgraph not installed.")
+from google.genai import types as genai_types
+from npc_engine.engine import json_compat
+from npc_engine.engine.world.loader import YamlLoader
 
 load_dotenv()
 
@@ -20,6 +24,29 @@ from gamemaster.social_llm import (
 
 CONFIG_PATH = Path("npc_engine/config/social_world/nodes/personas/elves.yaml")
 PLAYER_STATE_PATH = Path("player_state.json")
+# NLU results from earlier runs: "persona|signature|context|input" -> trig_/ctx_ id
+NLU_CACHE_PATH = Path(".nlu_cache.json")
+# Embedding tier: option vectors persisted per persona/model, cosine cut-off for a confident match
+NLU_EMBEDDINGS_PATH = Path(".nlu_embeddings.npz")
+EMBED_MODEL = "text-embedding-004"
+EMBED_THRESHOLD = 0.55
+# Semantic cache tier: an input this close to an earlier LLM-classified input in the same context reuses its answer
+SEMANTIC_THRESHOLD = 0.92
+
+# Trigger/context id in an LLM answer, and the JSON array of a batched answer
+_ID_RE = re.compile(r"(trig_|ctx_)[a-zA-Z0-9_]+")
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.S)
+
+@lru_cache(maxsize=8)
+def _load_atlas(path: str) -> Dict[str, Any]:
+    return yaml.load(Path(path).read_bytes(), Loader=YamlLoader)
+
+# Dynamic NLU prompt segments (the option list lives in the static prefix)
+NLU_PROMPT = "Context: {context}. Input: '{player_input}'. Return ONLY relevant ID."
+NLU_BATCH_PROMPT = "For each row, pick ONLY the matching ID. Rows: {table}. Return ONLY a JSON array [{{\"idx\": <idx>, \"id\": <ID or None>}}]."
+
+REPORT_HEADER = f"{ 'Step':<2} | { 'Input':<25} | { 'Res':<8} | { 'Pat':<4} | { 'Sins':<4} | {'Context'}"
+REPORT_SEPARATOR = "-" * 80
 
 # 10 ЦЕПОЧЕК, ПРИВОДЯЩИХ К ФИНАЛУ
 SCENARIOS = {
@@ -46,21 +73,102 @@ SCENARIOS = {
 }
 
 class UniversalLogicStats:
-    def __init__(self, persona_id: str):
-        atlas = yaml.safe_load(Path(CONFIG_PATH).read_text())
+    def __init__(self, persona_id: str, use_llm: bool = True):
+        atlas = _load_atlas(str(CONFIG_PATH))
         self.persona = next((p for p in atlas["personas"] if p["id"] == persona_id), None)
         self.contexts = {c["id"]: c for c in self.persona["contexts"]}
         self.triggers = {t["id"]: t for t in self.persona["triggers"]}
         self.target_goal = "ctx_joined"
-        self.graph = self._build_graph()
+        # Immutable per persona: connection targets with their lock properties, walked by auto-progress
+        self._adj: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {
+            cid: [(c["to"], self.contexts.get(c["to"], {}).get("properties", {})) for c in ctx.get("connections", [])]
+            for cid, ctx in self.contexts.items()
+        }
+        self._goal_targets = frozenset({"ctx_joined", "ctx_partnership"})
+        self.use_llm = use_llm
+        self._rules = self._build_rules()
+        self._rule_misses: List[str] = []
+        self._inv_cache: Optional[Tuple[Tuple[int, int], FrozenSet[str]]] = None
+        # Static prompt segment: identical for every NLU call, so providers can cache its prefill
+        options = [f"ID: {tid} | {self.triggers[tid].get('name') or tid}" for tid in self.triggers]
+        options += [f"ID: {cid} | {self.contexts[cid].get('name') or cid}" for cid in self.contexts]
+        self._nlu_prefix = f"Classify player input into ONE relevant ID from: {options}"
+        # Batched calls answer one ID per row, so they get their own instruction
+        self._nlu_batch_prefix = f"Classify each row of player input into one relevant ID (or None) from: {options}"
+        # Cached answers are only valid for the option list and prompts they were produced with
+        self._nlu_signature = hashlib.sha1("\n".join(
+            [self._nlu_prefix, self._nlu_batch_prefix, NLU_PROMPT, NLU_BATCH_PROMPT, EMBED_MODEL, str(EMBED_THRESHOLD), str(SEMANTIC_THRESHOLD)]
+        ).encode()).hexdigest()[:16]
+        self._nlu_cache: Dict[str, str] = self._load_nlu_cache()
+        # One provider client per engine so its HTTP connection pool is reused across calls
+        self._client = None
+        # Embedding classifier: one unit vector per option, loaded on first use (empty = unavailable)
+        self._option_ids = list(self.triggers) + list(self.contexts)
+        self._option_texts = [
+            ({**self.triggers, **self.contexts}[oid].get("name") or oid.split("_", 1)[-1]).replace("_", " ")
+            for oid in self._option_ids
+        ]
+        self._option_vecs: Optional[np.ndarray] = None
+        # Semantic tier (this run only): context -> (input vectors, LLM answers); vectors of rows
+        # that missed both embedding tiers wait in _unanswered until the LLM replies
+        self._semantic: Dict[str, Tuple[List[np.ndarray], List[str]]] = defaultdict(lambda: ([], []))
+        self._unanswered: Dict[str, np.ndarray] = {}
+
+    def _build_rules(self) -> List[Tuple[re.Pattern, str]]:
+        """Keyword rules seeded from the persona YAML: trigger id/name/yields and context id/name
+        (stems shared by several options are dropped)."""
+        texts = {tid: [tid.removeprefix("trig_"), trig.get("name") or "", (trig.get("yields") or "").removeprefix("cpt_")]
+                 for tid, trig in self.triggers.items()}
+        texts.update({cid: [cid.removeprefix("ctx_"), ctx.get("name") or ""] for cid, ctx in self.contexts.items()})
+        owners = defaultdict(set)
+        for oid, parts in texts.items():
+            for word in re.findall(r"[a-z]{4,}", " ".join(parts).lower()):
+                owners[word[:5]].add(oid)
+        stems = defaultdict(list)
+        for stem, oids in owners.items():
+            if len(oids) == 1:
+                stems[next(iter(oids))].append(stem)
+        return [(re.compile(rf"\b(?:{'|'.join(sorted(words))})\w*", re.I), oid) for oid, words in stems.items()]
+
+    def _rule_match(self, player_input: str) -> Optional[str]:
+        for pattern, tid in self._rules:
+            if pattern.search(player_input):
+                return tid
+        return None
+
+    def _load_nlu_cache(self) -> Dict[str, str]:
+        try:
+            return json_compat.load_file(NLU_CACHE_PATH)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_nlu_cache(self):
+        # Keep other personas' entries; drop this persona's stale signatures and "None" answers
+        persona_prefix = f"{self.persona['id']}|"
+        current_prefix = f"{persona_prefix}{self._nlu_signature}|"
+        entries = {
+            k: v for k, v in self._nlu_cache.items()
+            if not k.startswith(persona_prefix) or (k.startswith(current_prefix) and v != "None")
+        }
+        try:
+            json_compat.dump_file(entries, NLU_CACHE_PATH)
+        except OSError:
+            pass
         
-    def _get_real_inventory(self) -> List[str]:
+    def _get_real_inventory(self) -> FrozenSet[str]:
+        # Re-parsed only when player_state.json changes on disk
         try:
-            data = json.loads(PLAYER_STATE_PATH.read_text())
-            return [k for k, v in data.get("inventory", {}).get("items", {}).items() if v > 0]
-        except: return []
+            st = PLAYER_STATE_PATH.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+            if self._inv_cache and self._inv_cache[0] == stamp:
+                return self._inv_cache[1]
+            data = json_compat.load_file(PLAYER_STATE_PATH)
+            items = frozenset(k for k, v in data.get("inventory", {}).get("items", {}).items() if v > 0)
+        except: return frozenset()
+        self._inv_cache = (stamp, items)
+        return items
 
-    def check_access(self, ctx_id: str, concepts: List[str], inventory: List[str]) -> Tuple[bool, str]:
+    def check_access(self, ctx_id: str, concepts: Set[str], inventory: FrozenSet[str]) -> Tuple[bool, str]:
         ctx = self.contexts.get(ctx_id, {})
         props = ctx.get("properties", {})
         if not props.get("is_locked", False): return True, ""
@@ -70,82 +178,233 @@ class UniversalLogicStats:
         if req_i and req_i not in inventory: return False, f"Need: {req_i}"
         return True, ""
 
-    def _nlu_classify(self, player_input: str, state: Dict[str, Any]) -> str:
-        options = [f"ID: {tid} | {self.triggers[tid].get('name') or tid}" for tid in self.triggers]
-        options += [f"ID: {cid} | {self.contexts[cid].get('name') or cid}" for cid in self.contexts]
-        prompt = f"Context: {state['current_context']}. Input: '{player_input}'. Return ONLY relevant ID from: {options}"
+    def _get_client(self):
+        # Created on first use: --no-llm runs and missing API keys do not fail at startup
+        if self._client is None:
+            self._client = setup_grok_client() if LLM_PROVIDER == "grok" else setup_gemini_client()
+        return self._client
+
+    def _llm_complete(self, prompt: str, batch: bool = False) -> str:
+        """Send the static NLU prefix (single or batch) plus the dynamic prompt segment to the configured provider."""
+        client = self._get_client()
+        system = self._nlu_batch_prefix if batch else self._nlu_prefix
+        if LLM_PROVIDER == "grok":
+            messages = [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
+            cache_key = f"nlu-{'batch-' if batch else ''}{self.persona['id']}"
+            return client.chat.completions.create(
+                model=GROK_MODEL, messages=messages, extra_body={"prompt_cache_key": cache_key}
+            ).choices[0].message.content.strip()
+        config = genai_types.GenerateContentConfig(system_instruction=system)
+        return client.models.generate_content(model=GEMINI_MODEL, contents=prompt, config=config).text.strip()
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Unit-normalized embedding rows for texts (one provider call)."""
+        res = self._get_client().models.embed_content(model=EMBED_MODEL, contents=texts)
+        vecs = np.array([e.values for e in res.embeddings], dtype=np.float32)
+        return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+    def _load_option_vecs(self) -> np.ndarray:
+        if LLM_PROVIDER == "grok":
+            return np.empty(0)  # only the Gemini embedding endpoint is wired up
+        key = hashlib.sha1("\n".join([EMBED_MODEL, self.persona["id"], *self._option_texts]).encode()).hexdigest()
         try:
-            client_func = setup_grok_client if LLM_PROVIDER == "grok" else setup_gemini_client
-            res = client_func().chat.completions.create(model=GROK_MODEL, messages=[{"role": "user", "content": prompt}]).choices[0].message.content.strip() if LLM_PROVIDER == "grok" else client_func().models.generate_content(model=GEMINI_MODEL, contents=prompt).text.strip()
-            match = re.search(r"(trig_|ctx_)[a-zA-Z0-9_]+", res)
-            return match.group(0) if match else "None"
+            with np.load(NLU_EMBEDDINGS_PATH) as data:
+                if str(data["key"]) == key:
+                    return data["vecs"]
+        except (OSError, KeyError, ValueError):
+            pass
+        try:
+            vecs = self._embed(self._option_texts)
+        except Exception:
+            return np.empty(0)
+        try:
+            np.savez(NLU_EMBEDDINGS_PATH, key=key, vecs=vecs)
+        except OSError:
+            pass
+        return vecs
+
+    def _embed_classify(self, rows: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """Embedding tiers for each (context, input) row: the answer to a near-identical earlier input
+        in the same context (>= SEMANTIC_THRESHOLD), else the nearest option (>= EMBED_THRESHOLD), else None."""
+        if self._option_vecs is None:
+            self._option_vecs = self._load_option_vecs()
+        if not rows or not self._option_vecs.size:
+            return [None] * len(rows)
+        try:
+            queries = self._embed([f"{ctx}: {inp}" for ctx, inp in rows])
+        except Exception:
+            return [None] * len(rows)
+        option_scores = queries @ self._option_vecs.T
+        hits = []
+        for (ctx, inp), query, scores in zip(rows, queries, option_scores):
+            hit = self._semantic_match(ctx, query)
+            if hit is None:
+                j = int(scores.argmax())
+                hit = self._option_ids[j] if scores[j] >= EMBED_THRESHOLD else None
+            if hit is None:
+                self._unanswered[self._nlu_key(ctx, inp)] = query
+            hits.append(hit)
+        return hits
+
+    def _semantic_match(self, context: str, query: np.ndarray) -> Optional[str]:
+        vecs, answers = self._semantic.get(context, ((), ()))
+        if not vecs:
+            return None
+        scores = np.stack(vecs) @ query
+        j = int(scores.argmax())
+        return answers[j] if scores[j] >= SEMANTIC_THRESHOLD else None
+
+    def _cache_llm_answer(self, context: str, player_input: str, result: str) -> str:
+        """Store an LLM answer in the exact cache and file its input vector under the semantic tier."""
+        key = self._nlu_key(context, player_input)
+        self._nlu_cache[key] = result
+        query = self._unanswered.pop(key, None)
+        if query is not None and result != "None":
+            vecs, answers = self._semantic[context]
+            vecs.append(query); answers.append(result)
+        return result
+
+    def _nlu_key(self, context: str, player_input: str) -> str:
+        return f"{self.persona['id']}|{self._nlu_signature}|{context}|{player_input}"
+
+    @staticmethod
+    def _fast_access_ok(props: Dict[str, Any], concepts: set, inventory: set) -> bool:
+        """check_access on pre-fetched context properties, without the reason string."""
+        if not props.get("is_locked", False): return True
+        req_c = props.get("required_concept")
+        if req_c and req_c not in concepts: return False
+        req_i = props.get("required_item")
+        return not (req_i and req_i not in inventory)
+
+    def _nlu_classify(self, player_input: str, state: Dict[str, Any], try_embedding: bool = True) -> str:
+        if not self.use_llm:
+            # Rule-coverage mode: YAML keyword rules stand in for the LLM, cached answers do not count
+            rule_hit = self._rule_match(player_input)
+            if rule_hit:
+                return rule_hit
+            self._rule_misses.append(player_input)
+            return "None"
+        # Same persona, context and wording always classify the same way
+        cache_key = self._nlu_key(state['current_context'], player_input)
+        cached = self._nlu_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        if try_embedding:
+            hit = self._embed_classify([(state['current_context'], player_input)])[0]
+            if hit:
+                self._nlu_cache[cache_key] = hit
+                return hit
+        prompt = NLU_PROMPT.format(context=state['current_context'], player_input=player_input)
+        try:
+            match = _ID_RE.search(self._llm_complete(prompt))
         except: return "None"
+        # Only answered calls are cached ("None" for this run only, see _save_nlu_cache);
+        # failed requests are retried next time
+        return self._cache_llm_answer(state['current_context'], player_input, match.group(0) if match else "None")
 
-    def _build_graph(self) -> Any:
-        sg = StateGraph(dict)
-        def logic_gate(state: Dict[str, Any]):
-            new_state = state.copy(); next_step = state.get("next_step", "None")
-            concepts = state.get("concepts", []); inv = self._get_real_inventory()
-            patience = state.get("patience", 3); sins = state.get("sin_count", 0)
-            new_state["last_action_result"] = "SUCCESS"
-
-            if next_step in self.contexts:
-                allowed, _ = self.check_access(next_step, concepts, inv)
-                if allowed: new_state["current_context"] = next_step
-                else: new_state["last_action_result"] = "REJECTED"; sins += 1; patience -= 1
-            elif next_step in self.triggers:
-                trig = self.triggers[next_step]
-                allowed, _ = self.check_access(trig["parent_context"], concepts, inv)
-                if allowed:
-                    req_i = trig.get("requires_item")
-                    if req_i and req_i not in inv:
-                        new_state["last_action_result"] = "REJECTED"; sins += 1; patience -= 1
-                    else:
-                        new_state["current_context"] = trig["parent_context"]
-                        if trig.get("yields"): new_state["concepts"] = list(set(concepts) | {trig["yields"]})
-                else: new_state["last_action_result"] = "REJECTED"; sins += 1; patience -= 1
-            
-            # Sin-based Logic
-            cur_ctx_props = self.contexts[new_state["current_context"]].get("properties", {})
-            mood = cur_ctx_props.get("induces_mood", "neutral")
-            if mood in ["angry", "cynical"]: sins += 1; patience = 0 if mood == "angry" else 1
-            if next_step == "trig_apologize" or (mood == "neutral" and new_state["last_action_result"] == "SUCCESS"):
-                patience = 3 if sins < 3 else 2
-            
-            # Auto-progress to goal
-            for conn in self.contexts[new_state['current_context']].get("connections", []):
-                target = conn["to"]
-                if self.check_access(target, new_state['concepts'], inv)[0] and target in ["ctx_joined", "ctx_partnership"]:
-                    new_state["current_context"] = target
-
-            new_state.update({"patience": max(0, round(patience, 1)), "sin_count": sins})
-            return new_state
-
-        sg.add_node("gate", logic_gate); sg.set_entry_point("gate"); sg.add_edge("gate", END)
-        return sg.compile()
+    def _nlu_classify_batch(self, rows: List[Tuple[str, str]]) -> List[str]:
+        """Classify (context, input) rows with one embedding and one LLM call; misses fall back to _nlu_classify."""
+        pending = sorted({row for row in rows if self._nlu_key(*row) not in self._nlu_cache}) if self.use_llm else []
+        if pending:
+            for row, hit in zip(pending, self._embed_classify(pending)):
+                if hit:
+                    self._nlu_cache[self._nlu_key(*row)] = hit
+            pending = [row for row in pending if self._nlu_key(*row) not in self._nlu_cache]
+        if len(pending) > 1:
+            table = json.dumps([{"idx": i, "ctx": ctx, "input": inp} for i, (ctx, inp) in enumerate(pending)], ensure_ascii=False)
+            prompt = NLU_BATCH_PROMPT.format(table=table)
+            try:
+                answer = json_compat.loads(_JSON_ARRAY_RE.search(self._llm_complete(prompt, batch=True)).group(0))
+                ids = {int(item["idx"]): item.get("id") for item in answer}
+                # A short, padded or misnumbered array cannot be trusted row by row
+                if len(answer) == len(pending) and sorted(ids) == list(range(len(pending))):
+                    for idx, answer_id in ids.items():
+                        match = _ID_RE.search(str(answer_id))
+                        self._cache_llm_answer(*pending[idx], match.group(0) if match else "None")
+            except Exception:
+                pass  # rows left uncached are classified one by one below
+        return [self._nlu_classify(inp, {"current_context": ctx}, try_embedding=False) for ctx, inp in rows]
+
+    def _logic_gate(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        # Returns only the keys this step changes; concepts stay a set end-to-end
+        next_step = state.get("next_step", "None")
+        concepts = state.get("concepts", set()); inv = self._get_real_inventory()
+        patience = state.get("patience", 3); sins = state.get("sin_count", 0)
+        context = state["current_context"]; result = "SUCCESS"
+
+        if next_step in self.contexts:
+            allowed, _ = self.check_access(next_step, concepts, inv)
+            if allowed: context = next_step
+            else: result = "REJECTED"; sins += 1; patience -= 1
+        elif next_step in self.triggers:
+            trig = self.triggers[next_step]
+            # Triggers without a parent_context (e.g. trig_hire_companion) fire where the player is
+            parent = trig.get("parent_context", context)
+            allowed, _ = self.check_access(parent, concepts, inv)
+            if allowed:
+                req_i = trig.get("requires_item")
+                if req_i and req_i not in inv:
+                    result = "REJECTED"; sins += 1; patience -= 1
+                else:
+                    context = parent
+                    if trig.get("yields"): concepts = concepts | {trig["yields"]}
+            else: result = "REJECTED"; sins += 1; patience -= 1
+        
+        # Sin-based Logic
+        cur_ctx_props = self.contexts[context].get("properties", {})
+        mood = cur_ctx_props.get("induces_mood", "neutral")
+        if mood in ["angry", "cynical"]: sins += 1; patience = 0 if mood == "angry" else 1
+        if next_step == "trig_apologize" or (mood == "neutral" and result == "SUCCESS"):
+            patience = 3 if sins < 3 else 2
+        
+        # Auto-progress to goal
+        for target, props in self._adj[context]:
+            if target in self._goal_targets and self._fast_access_ok(props, concepts, inv):
+                context = target
+
+        update = {"current_context": context, "last_action_result": result,
+                  "patience": max(0, round(patience, 1)), "sin_count": sins}
+        if concepts is not state.get("concepts"): update["concepts"] = concepts
+        return update
 
     def run_all(self):
-        for name, steps in SCENARIOS.items():
-            state = {"concepts": ["cpt_quest_none"], "current_context": "ctx_tavern_intro", "patience": 3, "sin_count": 0}
-            print(f"\n>>> SCENARIO: {name}")
-            print(f"{ 'Step':<2} | { 'Input':<25} | { 'Res':<8} | { 'Pat':<4} | { 'Sins':<4} | {'Context'}")
-            print("-" * 80)
-            for i, inp in enumerate(steps, 1):
+        # Scenarios advance in lockstep so each step's inputs share one batched NLU call;
+        # the context a row is classified in is only known after the previous step.
+        states = {name: {"concepts": {"cpt_quest_none"}, "current_context": "ctx_tavern_intro", "patience": 3, "sin_count": 0} for name in SCENARIOS}
+        rows = {name: [] for name in SCENARIOS}
+        for i in range(max(map(len, SCENARIOS.values()))):
+            active = [name for name, steps in SCENARIOS.items() if i < len(steps)]
+            step_ids = self._nlu_classify_batch([(states[name]["current_context"], SCENARIOS[name][i]) for name in active])
+            for name, step_id in zip(active, step_ids):
+                inp = SCENARIOS[name][i]
+                state = states[name]
                 state["last_input"] = inp
-                state["next_step"] = self._nlu_classify(inp, state)
-                state = self.graph.invoke(state)
-                print(f"{i:<4} | {inp[:25]:<25} | {state['last_action_result']:<8} | {state['patience']:<4} | {state['sin_count']:<4} | {state['current_context']}")
-            
+                state["next_step"] = step_id
+                state.update(self._logic_gate(state))
+                rows[name].append(f"{i + 1:<4} | {inp[:25]:<25} | {state['last_action_result']:<8} | {state['patience']:<4} | {state['sin_count']:<4} | {state['current_context']}")
+
+        # The whole report goes out in one write
+        report = []
+        for name, state in states.items():
+            report += [f"\n>>> SCENARIO: {name}", REPORT_HEADER, REPORT_SEPARATOR, *rows[name]]
             if state['current_context'] == self.target_goal:
-                print(f"\033[92m[FINAL] Goal Reached: SUCCESS\033[0m")
+                report.append(f"\033[92m[FINAL] Goal Reached: SUCCESS\033[0m")
             else:
-                print(f"\033[91m[FINAL] Goal Reached: FAILED (at {state['current_context']})\033[0m")
+                report.append(f"\033[91m[FINAL] Goal Reached: FAILED (at {state['current_context']})\033[0m")
+        sys.stdout.write("\n".join(report) + "\n")
+        self._save_nlu_cache()
 
 if __name__ == "__main__":
     # Ensure no coin
-    with open(PLAYER_STATE_PATH, "r") as f: d = json.load(f)
+    d = json_compat.load_file(PLAYER_STATE_PATH)
     if "item_shadow_coin" in d["inventory"]["items"]:
         del d["inventory"]["items"]["item_shadow_coin"]; 
-        with open(PLAYER_STATE_PATH, "w") as f: json.dump(d, f, indent=2)
-    AdvancedStatsEngine = UniversalLogicStats("persona_dolores")
-    AdvancedStatsEngine.run_all()
\ No newline at end of file
+        json_compat.dump_file(d, PLAYER_STATE_PATH)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-llm", action="store_true", help="classify with keyword rules only and fail on uncovered inputs")
+    args = parser.parse_args()
+    AdvancedStatsEngine = UniversalLogicStats("persona_dolores", use_llm=not args.no_llm)
+    AdvancedStatsEngine.run_all()
+    if AdvancedStatsEngine._rule_misses:
+        print(f"Inputs not covered by rules: {sorted(set(AdvancedStatsEngine._rule_misses))}")
+        sys.exit(1)
\ No newline at end of file
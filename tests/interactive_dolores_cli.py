@@ -14,7 +14,7 @@ Notes:
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import sys
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -51,9 +51,46 @@ class DialogueState:
     hostile: bool = False
     mood: str | None = None
     items: Set[str] = field(default_factory=set)
+    # Last to_dynamic_state() result; mutate through the helpers below so it is rebuilt
+    _cache: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+    _dirty: bool = field(default=True, init=False, repr=False, compare=False)
+
+    def add_concept(self, concept_id: str):
+        self.concepts.add(concept_id)
+        self._dirty = True
+
+    def add_item(self, item_id: str):
+        self.items.add(item_id)
+        self._dirty = True
+
+    def add_visited(self, context_id: str):
+        self.visited.add(context_id)
+        self._dirty = True
+
+    def add_exhausted(self, trigger_id: str):
+        self.exhausted_triggers.add(trigger_id)
+        self._dirty = True
+
+    def add_unlocked(self, context_id: str):
+        self.unlocked.add(context_id)
+        self._dirty = True
+
+    def set_context(self, context_id: str):
+        self.current_context = context_id
+        self._dirty = True
+
+    def set_mood(self, mood: str | None):
+        self.mood = mood
+        self._dirty = True
+
+    def set_hostile(self, hostile: bool):
+        self.hostile = hostile
+        self._dirty = True
 
     def to_dynamic_state(self) -> Dict:
-        return {
+        if not self._dirty and self._cache is not None:
+            return self._cache
+        self._cache = {
             "current_context": self.current_context,
             "concepts": sorted(self.concepts),
             "visited_contexts": sorted(self.visited),
@@ -63,6 +100,8 @@ class DialogueState:
             "current_mood": self.mood,
             "items": sorted(self.items),
         }
+        self._dirty = False
+        return self._cache
 
 
 def build_world():
@@ -72,12 +111,15 @@ def build_world():
     assembler.apply_persona_overrides(contexts, "persona_dolores", personas)
 
     # Inject test-only edge to let us reach partnership in this sandbox harness
+    existing: Dict[str, Set[str]] = {}
     for frm, to in EXTRA_CONNECTIONS:
         if frm in contexts:
-            ctx = contexts[frm]
-            ctx.setdefault("connections", [])
-            if not any(c.get("to") == to for c in ctx["connections"]):
-                ctx["connections"].append({"to": to, "direction": "forward"})
+            conns = contexts[frm].setdefault("connections", [])
+            if frm not in existing:
+                existing[frm] = {c.get("to") for c in conns}
+            if to not in existing[frm]:
+                conns.append({"to": to, "direction": "forward"})
+                existing[frm].add(to)
 
     return assembler, contexts, concepts, triggers, target_persona
 
@@ -88,8 +130,8 @@ def start_state(contexts: Dict[str, Dict]) -> DialogueState:
         start_ctx = list(contexts.keys())[0]
     state = DialogueState(current_context=start_ctx)
     # Seed baseline concept so the intro path can unlock
-    state.concepts.add("cpt_quest_none")
-    state.visited.add(start_ctx)
+    state.add_concept("cpt_quest_none")
+    state.add_visited(start_ctx)
     return state
 
 
@@ -120,12 +162,24 @@ def print_state(state: DialogueState):
     print("")
 
 
-def triggers_in_context(current_context: str, triggers: Dict[str, Dict]) -> List[str]:
-    available = []
+def build_indexes(contexts: Dict[str, Dict], triggers: Dict[str, Dict]) -> Tuple[Dict[str, List[str]], Dict[str, Set[str]]]:
+    """Per-context trigger lists and context adjacency; both are fixed for the session."""
+    triggers_by_ctx: Dict[str, List[str]] = {}
     for tid, trig in triggers.items():
-        if trig.get("parent_context") == current_context:
-            available.append(f"{tid} -> yields {trig.get('yields')}")
-    return available
+        triggers_by_ctx.setdefault(trig.get("parent_context"), []).append(tid)
+    adj: Dict[str, Set[str]] = {cid: set() for cid in contexts}
+    for cid, ctx in contexts.items():
+        for conn in ctx.get("connections", []) or []:
+            target = conn.get("to")
+            if target:
+                adj[cid].add(target)
+                if conn.get("direction") == "bidirectional":
+                    adj.setdefault(target, set()).add(cid)
+    return triggers_by_ctx, adj
+
+
+def triggers_in_context(current_context: str, triggers: Dict[str, Dict], triggers_by_ctx: Dict[str, List[str]]) -> List[str]:
+    return [f"{tid} -> yields {triggers[tid].get('yields')}" for tid in triggers_by_ctx.get(current_context, [])]
 
 
 def try_trigger(tid: str, state: DialogueState, triggers: Dict[str, Dict]):
@@ -141,14 +195,14 @@ def try_trigger(tid: str, state: DialogueState, triggers: Dict[str, Dict]):
         return
     yields = trig.get("yields")
     if yields:
-        state.concepts.add(yields)
+        state.add_concept(yields)
         print(f"Added concept {yields}")
     # Simulate item gain if mapped
     gained_item = TRIGGER_ITEM_GAINS.get(tid)
     if gained_item:
-        state.items.add(gained_item)
+        state.add_item(gained_item)
         print(f"Added item {gained_item}")
-    state.exhausted_triggers.add(tid)
+    state.add_exhausted(tid)
 
 
 def try_unlock(target: str, state: DialogueState, contexts: Dict[str, Dict]):
@@ -169,44 +223,35 @@ def try_unlock(target: str, state: DialogueState, contexts: Dict[str, Dict]):
         if any(c not in state.concepts for c in combo):
             print(f"Need combo {combo} to unlock {target}")
             return
-    state.unlocked.add(target)
+    state.add_unlocked(target)
     print(f"{target} unlocked.")
 
 
-def connected_from(contexts: Dict[str, Dict], source: str) -> Set[str]:
-    ctx = contexts.get(source) or {}
-    conns = ctx.get("connections", []) or []
-    targets = set()
-    for conn in conns:
-        target = conn.get("to")
-        if target:
-            targets.add(target)
-            if conn.get("direction") == "bidirectional":
-                targets.add(source)
-    return targets
+def connected_from(adj: Dict[str, Set[str]], source: str) -> Set[str]:
+    return adj.get(source, set())
 
 
-def try_shift(target: str, state: DialogueState, contexts: Dict[str, Dict]):
-    targets = connected_from(contexts, state.current_context)
-    if target not in targets:
+def try_shift(target: str, state: DialogueState, contexts: Dict[str, Dict], adj: Dict[str, Set[str]]):
+    if target not in connected_from(adj, state.current_context):
         print(f"{target} is not connected from {state.current_context}")
         return
     target_props = contexts.get(target, {}).get("properties", {})
     if target_props.get("is_locked") and target not in state.unlocked:
         print(f"{target} is locked. Unlock first.")
         return
-    state.current_context = target
-    state.visited.add(target)
+    state.set_context(target)
+    state.add_visited(target)
     print(f"Shifted to {target}")
 
 
-def run_planner(state: DialogueState):
-    orch = PDDLOrchestrator()
-    planner = MasterPlanner()
-    ps = PlayerState(player_id="tester")
-    # Populate inventory for planning if any items were gathered
+def run_planner(state: DialogueState, orch: PDDLOrchestrator, planner: MasterPlanner, ps: PlayerState):
+    # Sync the reused inventory with the items gathered so far
+    inventory = ps.inventory
+    for item_id in [i for i in inventory.items if i not in state.items]:
+        inventory.remove_item(item_id, inventory.items[item_id])
     for item_id in state.items:
-        ps.inventory.add_item(item_id)
+        if item_id not in inventory.items:
+            inventory.add_item(item_id)
     domain, problem = orch.generate(
         mode="social",
         player_state=ps,
@@ -226,7 +271,12 @@ def run_planner(state: DialogueState):
 
 def main():
     assembler, contexts, concepts, triggers, target_persona = build_world()
+    triggers_by_ctx, adj = build_indexes(contexts, triggers)
     state = start_state(contexts)
+    # Planner objects and the planning player are built once per session
+    orch = PDDLOrchestrator()
+    planner = MasterPlanner()
+    ps = PlayerState(player_id="tester")
     list_actions(contexts, triggers)
     while True:
         cmd = input("dolores> ").strip()
@@ -243,24 +293,24 @@ def main():
         elif action == "show":
             print_state(state)
         elif action == "triggers":
-            avail = triggers_in_context(state.current_context, triggers)
+            avail = triggers_in_context(state.current_context, triggers, triggers_by_ctx)
             print("\n".join(avail) if avail else "No triggers here.")
         elif action == "trigger" and arg:
             try_trigger(arg, state, triggers)
         elif action == "unlock" and arg:
             try_unlock(arg, state, contexts)
         elif action == "shift" and arg:
-            try_shift(arg, state, contexts)
+            try_shift(arg, state, contexts, adj)
         elif action == "plan":
-            run_planner(state)
+            run_planner(state, orch, planner, ps)
         elif action == "mood" and arg:
-            state.mood = arg
+            state.set_mood(arg)
             print(f"Mood set to {arg}")
         elif action == "additem" and arg:
-            state.items.add(arg)
+            state.add_item(arg)
             print(f"Item added: {arg}")
         elif action == "addconcept" and arg:
-            state.concepts.add(arg)
+            state.add_concept(arg)
             print(f"Concept added: {arg}")
         else:
             print("Unknown command. Type 'help' for options.")
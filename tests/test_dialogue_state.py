@@ -0,0 +1,11 @@
+from interactive_dolores_cli import DialogueState
+
+
+def test_set_hostile_rebuilds_cached_dynamic_state():
+    """set_hostile marks the state dirty, so the cached dict picks up the new flag."""
+    state = DialogueState(current_context="ctx_tavern_intro")
+    assert state.to_dynamic_state()["is_hostile"] is False
+
+    state.set_hostile(True)
+
+    assert state.to_dynamic_state()["is_hostile"] is True
@@ -0,0 +1,14 @@
+from pathlib import Path
+
+from npc_engine.engine import json_compat
+
+
+def test_dump_and_load_file_round_trip(tmp_path):
+    """Player-state style dicts survive a round trip; Paths are written as strings."""
+    data = {"id": "player_001", "inventory": {"items": {"rope": 2}}, "name": "Долорес", "home": Path("a/b")}
+    path = tmp_path / "player_state.json"
+
+    json_compat.dump_file(data, path)
+
+    assert path.read_text(encoding="utf-8").startswith('{\n  "id"')
+    assert json_compat.load_file(path) == {**data, "home": "a/b"}
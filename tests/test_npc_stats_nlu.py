@@ -0,0 +1,122 @@
+import numpy as np
+
+import test_npc_stats
+from npc_engine.engine import json_compat
+from test_npc_stats import UniversalLogicStats
+
+
+def test_rules_come_from_persona_yaml(tmp_path, monkeypatch):
+    """--no-llm mode: keyword rules target persona options and are seeded from their YAML names."""
+    monkeypatch.setattr(test_npc_stats, "NLU_CACHE_PATH", tmp_path / "nlu_cache.json")
+    engine = UniversalLogicStats("persona_dolores", use_llm=False)
+
+    assert {oid for _, oid in engine._rules} <= set(engine.triggers) | set(engine.contexts)
+    assert engine._nlu_classify("I agree to the partnership.", {"current_context": "ctx_tavern_intro"}) == "trig_accept_partnership"
+    assert engine._nlu_classify("I have the scroll.", {"current_context": "ctx_tavern_intro"}) == "trig_accept_shadow_deal"
+    assert engine._nlu_classify("Hmm.", {"current_context": "ctx_tavern_intro"}) == "None"
+    assert engine._rule_misses == ["Hmm."]
+
+
+def test_llm_mode_does_not_consult_rules(tmp_path, monkeypatch):
+    """With the LLM enabled, an input a rule would match is still classified by the model."""
+    monkeypatch.setattr(test_npc_stats, "NLU_CACHE_PATH", tmp_path / "nlu_cache.json")
+    engine = UniversalLogicStats("persona_dolores")
+    monkeypatch.setattr(engine, "_embed_classify", lambda rows: [None] * len(rows))
+    monkeypatch.setattr(engine, "_llm_complete", lambda prompt, batch=False: "ctx_bar_counter")
+
+    assert engine._nlu_classify("I agree to the partnership.", {"current_context": "ctx_tavern_intro"}) == "ctx_bar_counter"
+
+
+def test_nlu_cache_is_keyed_by_option_signature_and_skips_none(tmp_path, monkeypatch):
+    """Persisted entries carry the prompt/option signature; "None" answers are not written."""
+    cache_path = tmp_path / "nlu_cache.json"
+    monkeypatch.setattr(test_npc_stats, "NLU_CACHE_PATH", cache_path)
+    engine = UniversalLogicStats("persona_dolores")
+    engine._nlu_cache[engine._nlu_key("ctx_tavern_intro", "Hmm.")] = "None"
+    engine._nlu_cache[engine._nlu_key("ctx_tavern_intro", "Nice hat.")] = "ctx_bar_counter"
+    engine._save_nlu_cache()
+
+    saved = json_compat.load_file(cache_path)
+    assert saved == {engine._nlu_key("ctx_tavern_intro", "Nice hat."): "ctx_bar_counter"}
+
+    monkeypatch.setattr(test_npc_stats, "NLU_PROMPT", test_npc_stats.NLU_PROMPT + " ")
+    reloaded = UniversalLogicStats("persona_dolores")
+    assert reloaded._nlu_key("ctx_tavern_intro", "Nice hat.") not in saved
+
+
+def _batch_engine(tmp_path, monkeypatch, reply):
+    monkeypatch.setattr(test_npc_stats, "NLU_CACHE_PATH", tmp_path / "nlu_cache.json")
+    engine = UniversalLogicStats("persona_dolores")
+    monkeypatch.setattr(engine, "_embed_classify", lambda rows: [None] * len(rows))
+    calls = []
+
+    def fake_complete(prompt, batch=False):
+        calls.append(batch)
+        return reply if batch else "ctx_bar_counter"
+
+    monkeypatch.setattr(engine, "_llm_complete", fake_complete)
+    return engine, calls
+
+
+def test_nlu_batch_parses_json_array_under_batch_instruction(tmp_path, monkeypatch):
+    """A well-formed batch answer fills every row from one call sent with the batch prefix."""
+    reply = 'Sure: [{"idx": 0, "id": "trig_listen_rumors"}, {"idx": 1, "id": "None"}]'
+    engine, calls = _batch_engine(tmp_path, monkeypatch, reply)
+    rows = [("ctx_tavern_intro", "Hmm."), ("ctx_tavern_intro", "Nice hat.")]
+
+    assert engine._nlu_classify_batch(rows) == ["trig_listen_rumors", "None"]
+    assert calls == [True]
+    assert engine._nlu_batch_prefix != engine._nlu_prefix
+
+
+def test_nlu_batch_length_mismatch_falls_back_per_row(tmp_path, monkeypatch):
+    """A batch answer missing rows is discarded and every row is asked on its own."""
+    engine, calls = _batch_engine(tmp_path, monkeypatch, '[{"idx": 0, "id": "trig_listen_rumors"}]')
+    rows = [("ctx_tavern_intro", "Hmm."), ("ctx_tavern_intro", "Nice hat.")]
+
+    assert engine._nlu_classify_batch(rows) == ["ctx_bar_counter", "ctx_bar_counter"]
+    assert calls == [True, False, False]
+
+
+
+def test_trigger_without_parent_fires_in_current_context(tmp_path, monkeypatch):
+    """trig_hire_companion has no parent_context: it yields its concept where the player stands."""
+    monkeypatch.setattr(test_npc_stats, "NLU_CACHE_PATH", tmp_path / "nlu_cache.json")
+    engine = UniversalLogicStats("persona_dolores", use_llm=False)
+    monkeypatch.setattr(engine, "_get_real_inventory", lambda: frozenset({"item_shadow_coin"}))
+    assert "parent_context" not in engine.triggers["trig_hire_companion"]
+
+    state = {"current_context": "ctx_bar_counter", "next_step": "trig_hire_companion", "concepts": set()}
+
+    update = engine._logic_gate(state)
+    assert update["last_action_result"] == "SUCCESS"
+    assert update["concepts"] == {"cpt_partnership_offer"}
+    assert update["current_context"] == "ctx_bar_counter"
+
+    monkeypatch.setattr(engine, "_get_real_inventory", lambda: frozenset())
+    assert engine._logic_gate(state)["last_action_result"] == "REJECTED"
+
+
+def test_semantic_tier_reuses_answer_for_near_identical_input_in_same_context(tmp_path, monkeypatch):
+    """An input close to an LLM-classified one in the same context skips the LLM; another context does not."""
+    monkeypatch.setattr(test_npc_stats, "NLU_CACHE_PATH", tmp_path / "nlu_cache.json")
+    engine = UniversalLogicStats("persona_dolores")
+    monkeypatch.setattr(engine, "_load_option_vecs", lambda: np.array([[0.0, 0.0, 1.0]], dtype=np.float32))
+    vectors = {"Sorry about that.": [1.0, 0.0, 0.0], "Sorry about that!": [0.99, 0.14, 0.0]}
+    monkeypatch.setattr(engine, "_embed", lambda texts: np.array(
+        [vectors[text.split(": ", 1)[1]] for text in texts], dtype=np.float32))
+    calls = []
+
+    def fake_complete(prompt, batch=False):
+        calls.append(prompt)
+        return "trig_apologize"
+
+    monkeypatch.setattr(engine, "_llm_complete", fake_complete)
+    intro = {"current_context": "ctx_tavern_intro"}
+
+    assert engine._nlu_classify("Sorry about that.", intro) == "trig_apologize"
+    assert engine._nlu_classify("Sorry about that!", intro) == "trig_apologize"
+    assert len(calls) == 1
+
+    assert engine._nlu_classify("Sorry about that!", {"current_context": "ctx_brawl"}) == "trig_apologize"
+    assert len(calls) == 2
@@ -0,0 +1,73 @@
+import time
+from unittest import mock
+
+from npc_engine.engine.world.graph import Condition, ConditionType
+from npc_engine.engine.world.player_state import GraphDiff, PlayerInventory, PlayerState
+
+
+def test_respawn_uses_latest_schedule_per_npc():
+    """Rescheduling an NPC replaces its earlier timer; expired NPCs are restored once."""
+    player = PlayerState(player_id="tester")
+    player.schedule_respawn("wolf", 10)
+    player.schedule_respawn("bandit", 100)
+    player.schedule_respawn("wolf", 50)
+    now = time.time()
+
+    assert player.check_and_process_respawns(now + 20) == []
+    assert player.check_and_process_respawns(now + 60) == ["wolf"]
+    assert "wolf" not in player.defeated_enemies
+    assert "bandit" in player.graph_diff.removed_nodes
+    assert player.check_and_process_respawns(now + 200) == ["bandit"]
+    assert player.respawn_timers == {}
+
+
+def test_rescheduling_same_timestamp_respawns_once():
+    """Two identical (ts, npc) heap entries respawn the NPC once without raising."""
+    player = PlayerState(player_id="tester")
+    with mock.patch("time.time", return_value=1000.0):
+        player.schedule_respawn("wolf", 10)
+        player.schedule_respawn("wolf", 10)
+
+    assert player.check_and_process_respawns(2000.0) == ["wolf"]
+    assert player.respawn_timers == {}
+
+
+def test_graph_diff_edge_keys_round_trip_and_legacy_strings():
+    """Edge keys serialize as [from, to] pairs and legacy "from:to" strings still load."""
+    player = PlayerState(player_id="tester")
+    player.unlock_path("gate", "yard")
+
+    data = player.graph_diff.to_dict()
+    assert data["unlocked_edges"] == [["gate", "yard"]]
+    assert GraphDiff.from_dict(data).unlocked_edges == {("gate", "yard")}
+
+    legacy = GraphDiff.from_dict({"unlocked_edges": ["gate:yard"], "blocked_edges": ["cave:pit"]})
+    assert legacy.unlocked_edges == {("gate", "yard")}
+    assert legacy.blocked_edges == {("cave", "pit")}
+
+
+def test_inventory_size_tracks_adds_removes_and_initial_items():
+    """current_size follows add/remove and is synced from pre-populated items."""
+    inventory = PlayerInventory(items={"rope": 2}, capacity=5)
+    assert inventory.current_size == 2
+
+    assert inventory.add_item("torch", 3)
+    assert not inventory.add_item("torch")
+    assert inventory.current_size == 5
+
+    assert inventory.remove_item("rope", 2)
+    assert not inventory.remove_item("rope")
+    assert inventory.current_size == 3
+
+
+def test_check_condition_dispatch():
+    """Simple, STATE and nested OR/AND conditions evaluate against the player."""
+    player = PlayerState(player_id="tester")
+    player.inventory.add_item("rope")
+    player.set_object_state("lever", "pulled")
+
+    assert player.check_condition(Condition(type=ConditionType.HAS_ITEM, target="rope"))
+    assert player.check_condition(Condition(type=ConditionType.STATE, target="lever:pulled"))
+    assert not player.check_condition(Condition(type=ConditionType.STATE, target="lever:idle"))
+    assert player.check_condition(Condition.from_yaml({"OR": ["has_ability: climb", "has_item: rope"]}))
+    assert not player.check_condition(Condition.from_yaml({"AND": ["has_ability: climb", "has_item: rope"]}))
@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+
+import npc_engine.main_fast as main_fast
+
+client = TestClient(main_fast.app)
+
+
+def test_process_checks_body_fields_strictly():
+    """Only a real bool enables oracle mode; wrong field types and bad JSON are a structured 422."""
+    res = client.post("/process", json={"input_json": {"id": "tester"}, "oracle_mode": False})
+    assert res.status_code == 200
+    assert res.json()["oracle_used"] is False
+
+    res = client.post("/process", json={"input_json": {"id": "tester"}, "oracle_mode": "false"})
+    assert res.status_code == 422
+    assert res.json()["detail"][0]["loc"] == ["body", "oracle_mode"]
+
+    res = client.post("/process", json={"input_json": ["tester"]})
+    assert res.status_code == 422
+    assert res.json()["detail"][0]["loc"] == ["body", "input_json"]
+
+    res = client.post("/process", content=b"{bad")
+    assert res.status_code == 422
+    assert res.json()["detail"][0]["type"] == "json_invalid"
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import io
 import os
@@ -48,6 +49,15 @@ def _make_visual_gen(tmp_path: Path, response_parts):
 
 
 def _assert_valid_png(path: Path):
+    """Cheap PNG check: signature plus IHDR as the first chunk."""
+    with open(path, "rb") as f:
+        hdr = f.read(24)
+    assert hdr.startswith(b"\x89PNG\r\n\x1a\n")
+    assert hdr[12:16] == b"IHDR"
+
+
+def _assert_png_decodes(path: Path):
+    """Full decode via PIL; kept for end-to-end coverage in a single test."""
     with Image.open(path) as img:
         img.verify()  # type: ignore[attr-defined]
 
@@ -66,7 +76,7 @@ def test_as_image_pil_object(tmp_path, monkeypatch):
     assert out is not None
     out_path = Path(out)
     assert out_path.exists()
-    _assert_valid_png(out_path)
+    _assert_png_decodes(out_path)
 
 
 def test_inline_data_base64(tmp_path, monkeypatch):
@@ -121,6 +131,25 @@ def test_invalid_cache_is_replaced(tmp_path, monkeypatch):
         assert b"not an image" not in f.read()
 
 
+def test_generate_batch_keeps_request_order(tmp_path, monkeypatch):
+    """Batch generation runs every request and returns paths in request order."""
+    monkeypatch.setenv("GEMINI_API_KEY", "fake")
+
+    class Part:
+        text = None
+        inline_data = object()
+
+        def as_image(self):
+            return Image.new("RGB", (2, 2), (0, 0, 255))
+
+    gen = _make_visual_gen(tmp_path, [Part()])
+    requests = [{"location_id": loc, "name": loc, "description": "desc"} for loc in ("gate", "yard", "well")]
+    out = asyncio.run(gen.generate_batch(requests, max_concurrency=2))
+    assert [Path(p).name for p in out] == ["gate.png", "yard.png", "well.png"]
+    for p in out:
+        _assert_valid_png(Path(p))
+
+
 @pytest.mark.integration
 @pytest.mark.skipif(not os.getenv("GEMINI_API_KEY"), reason="GEMINI_API_KEY not set; live Gemini call skipped")
 def test_live_gemini_image_generation(tmp_path, monkeypatch):
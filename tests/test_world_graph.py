@@ -0,0 +1,85 @@
+import dataclasses
+import sys
+
+import pytest
+
+from npc_engine.engine.world.graph import (
+    Condition, ConditionType, LocationNode, NodeState, NodeType, WorldGraph, WorldNode
+)
+from npc_engine.engine.world.player_state import PlayerState
+from npc_engine.engine.world.regenerator import WorldRegenerator
+
+
+def test_condition_from_yaml_string_and_dict_forms():
+    """String, single-key dict and OR/AND forms parse to the same Condition shapes."""
+    cond = Condition.from_yaml("has_item: torch")
+    assert cond.type == ConditionType.HAS_ITEM
+    assert cond.target == "torch"
+
+    cond = Condition.from_yaml({"defeated": "orc_chief"})
+    assert cond.type == ConditionType.DEFEATED
+    assert cond.target == "orc_chief"
+
+    cond = Condition.from_yaml({"OR": ["has_item: rope", {"has_ability": "climb"}]})
+    assert cond.type == ConditionType.OR
+    assert [c.type for c in cond.sub_conditions] == [ConditionType.HAS_ITEM, ConditionType.HAS_ABILITY]
+
+    cond = Condition.from_yaml("gate_open")
+    assert cond.type == ConditionType.STATE
+    assert cond.target == "gate_open"
+
+
+@pytest.mark.parametrize("data", [{"bogus": "x"}, "bogus: x", {}, 42])
+def test_condition_from_yaml_rejects_unknown_input(data):
+    """Unknown condition keys and unsupported payloads raise ValueError."""
+    with pytest.raises(ValueError):
+        Condition.from_yaml(data)
+
+
+def test_condition_from_yaml_shares_identical_conditions():
+    """Equal condition literals parse to one shared Condition instance."""
+    first = Condition.from_yaml({"OR": ["has_item: rope", {"has_ability": "climb"}]})
+    second = Condition.from_yaml({"OR": [{"has_item": "rope"}, "has_ability: climb"]})
+    assert first is second
+    assert Condition.from_yaml("has_item: rope") is first.sub_conditions[0]
+    assert Condition.from_yaml("has_item: torch") is not first.sub_conditions[0]
+
+
+def test_shared_conditions_are_immutable():
+    """Shared conditions reject in-place edits instead of leaking them."""
+    cond = Condition.from_yaml({"AND": ["has_item: rope", "gate_open"]})
+    assert isinstance(cond.sub_conditions, tuple)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        cond.target = "cave"
+
+
+def test_regenerate_keeps_player_states_off_shared_nodes():
+    """Per-player node/object states live on the personalized world, not the base nodes."""
+    base = WorldGraph(world_id="w", name="W", description="")
+    for node in (
+        LocationNode(id="gate", type=NodeType.LOCATION, name="Gate", description=""),
+        WorldNode(id="lever", type=NodeType.OBJECT, name="Lever", description=""),
+    ):
+        base.all_nodes[node.id] = node
+
+    player = PlayerState(player_id="tester")
+    player.visit_location("gate")
+    player.set_object_state("lever", "pulled")
+
+    world = WorldRegenerator().regenerate(base, player)
+
+    assert world.get_node_state("gate") == NodeState.VISITED
+    assert world.get_custom_states("lever") == {"state": "pulled"}
+    assert base.all_nodes["gate"].state == NodeState.UNKNOWN
+    assert base.all_nodes["lever"].custom_states == {}
+
+
+def test_location_node_interns_region_and_contents():
+    """Region and contained_* ids are interned so they share identity with node ids."""
+    region = "".join(["north", "_vale"])
+    loc = LocationNode(
+        id="gate", type=NodeType.LOCATION, name="Gate", description="",
+        region=region, contained_items=["".join(["rusty", "_key"])],
+    )
+    assert loc.region is sys.intern("north_vale")
+    assert loc.contained_items[0] is sys.intern("rusty_key")
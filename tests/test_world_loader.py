@@ -0,0 +1,52 @@
+from pathlib import Path
+
+import yaml
+
+from npc_engine.engine.world.graph import EdgeType
+from npc_engine.engine.world.loader import load_world_from_flat_yaml
+
+
+def _write_world(root: Path, regions: dict) -> Path:
+    """Write a minimal flat-YAML world (meta + one file per region) under root."""
+    (root / "nodes" / "regions").mkdir(parents=True)
+    (root / "meta.yaml").write_text(yaml.safe_dump({"world_id": "test_world", "name": "Test World"}))
+    for region_id, locations in regions.items():
+        data = {"id": region_id, "type": "region", "name": region_id, "locations": locations}
+        (root / "nodes" / "regions" / f"{region_id}.yaml").write_text(yaml.safe_dump(data))
+    return root
+
+
+def test_bidirectional_connections_are_not_duplicated(tmp_path):
+    """A link declared bidirectional from both ends yields one edge per direction."""
+    world_dir = _write_world(tmp_path, {
+        "vale": [
+            {"id": "gate", "connections": [{"to": "yard", "edge_type": "path", "bidirectional": True}]},
+            {"id": "yard", "connections": [{"to": "gate", "edge_type": "path", "bidirectional": True}]},
+        ],
+    })
+
+    world = load_world_from_flat_yaml(world_dir)
+
+    keys = [(e.from_node, e.to_node, e.edge_type) for e in world.edges]
+    assert sorted(keys) == [("gate", "yard", EdgeType.PATH), ("yard", "gate", EdgeType.PATH)]
+
+
+def test_connection_lookups_use_edge_index(tmp_path):
+    """Indexed from/to lookups match the edge list, and both directions share conditions."""
+    world_dir = _write_world(tmp_path, {
+        "vale": [
+            {"id": "gate", "connections": [
+                {"to": "yard", "edge_type": "path", "bidirectional": True, "conditions": ["has_item: key"]},
+            ]},
+            {"id": "yard", "connections": [{"to": "well", "edge_type": "path"}]},
+            {"id": "well"},
+        ],
+    })
+
+    world = load_world_from_flat_yaml(world_dir)
+
+    assert [e.to_node for e in world.get_connections_from("yard")] == ["gate", "well"]
+    assert [e.from_node for e in world.get_connections_to("gate")] == ["yard"]
+    forward, = world.get_connections_from("gate")
+    reverse, = world.get_connections_to("gate")
+    assert forward.conditions is reverse.conditions
@@ -1,5 +1,8 @@
 import streamlit as st
 import sys
+import asyncio
+import hashlib
+import json
 from pathlib import Path
 import requests
 
@@ -7,6 +10,7 @@ import requests
 sys.path.insert(0, str(Path(__file__).parent))
 
 from gamemaster.engine_core import GameEngine
+from gamemaster.visual_generator import VisualGenerator
 
 # --- Config ---
 CONFIG_DIR = Path("npc_engine/config/social_world")
@@ -15,11 +19,33 @@ API_URL = "http://localhost:8000/process"
 st.set_page_config(page_title="DAQS World Builder & QA", page_icon="🏗️", layout="wide")
 
 # --- Logic ---
+def _refresh_world_version():
+    """Recompute the graph/path cache key and the location list.
+
+    The key is a content hash of world_map, so sessions holding the same
+    world share entries and any edit to node data yields a fresh key.
+    """
+    world_map = st.session_state.engine.cache["world_map"]
+    payload = json.dumps(world_map, sort_keys=True, default=str).encode()
+    st.session_state.world_version = hashlib.sha1(payload).hexdigest()
+    st.session_state.all_locs = list(world_map.keys())
+
 if "engine" not in st.session_state:
     st.session_state.engine = GameEngine(CONFIG_DIR)
+    _refresh_world_version()
 
 engine = st.session_state.engine
 
+# Graph rendering and pathfinding are pure functions of (start, target, world_version);
+# _engine is excluded from hashing, world_version stands in for its state.
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_graph(_engine, start, locs_tuple, target, world_version):
+    return _engine.render_world_graph(start, list(locs_tuple), full_map=True, target_node=target).source
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_path(_engine, start, target, world_version):
+    return _engine.get_path_requirements(start, target, map_key="world_map")
+
 # --- UI ---
 st.title("🏗️ DAQS World Builder & Validator")
 st.caption("Neuro-Symbolic Level Design Tool")
@@ -29,11 +55,22 @@ with st.sidebar:
     st.header("🛠 Controls")
     if st.button("♻️ Reload World Data"):
         engine.reload()
+        _refresh_world_version()
         st.success("World reloaded!")
+
+    if st.button("🖼️ Pre-render Location Visuals"):
+        jobs = [
+            {"location_id": loc_id, "name": loc.get("name", loc_id),
+             "description": loc.get("description", ""), "region": loc.get("region", "Fantasy World")}
+            for loc_id, loc in engine.cache["world_map"].items()
+        ]
+        with st.spinner(f"Rendering {len(jobs)} locations..."):
+            results = asyncio.run(VisualGenerator().generate_batch(jobs))
+        st.success(f"Rendered {sum(1 for r in results if r)}/{len(jobs)} location visuals.")
     
     st.divider()
     
-    all_locs = list(engine.cache["world_map"].keys())
+    all_locs = st.session_state.all_locs
     
     start_loc = st.selectbox("🚩 Start Location", all_locs, index=0 if all_locs else 0)
     target_loc = st.selectbox("🎯 Target Goal", all_locs, index=len(all_locs)-1 if all_locs else 0)
@@ -44,7 +81,7 @@ col_viz, col_qa = st.columns([0.6, 0.4])
 with col_viz:
     st.subheader("🗺️ World Topology")
     # Render FULL MAP for the designer with target highlighting
-    w_graph = engine.render_world_graph(start_loc, all_locs, full_map=True, target_node=target_loc)
+    w_graph = _cached_graph(engine, start_loc, tuple(all_locs), target_loc, st.session_state.world_version)
     st.graphviz_chart(w_graph)
 
 with col_qa:
@@ -53,7 +90,7 @@ with col_qa:
     if start_loc and target_loc:
         with st.status("Analyzing path...", expanded=True) as status:
             # 1. Oracle BFS Pathfinding (Returns tuple: reqs, nodes)
-            oracle_res = engine.get_path_requirements(start_loc, target_loc, map_key="world_map")
+            oracle_res = _cached_path(engine, start_loc, target_loc, st.session_state.world_version)
             
             if start_loc == target_loc:
                 st.info("Start and Target are the same.")